@@ -0,0 +1,297 @@
+"""
+Offline Harvester Benchmark
+- Serves a synthetic, infinitely paginated ThinkSpain-like listing page on localhost
+- Working "Show More" (a.show-more.pagination-load-next) fragment endpoint
+- Configurable response latency, cards per page and popup frequency
+- Runs ProductionHarvester against it with pacing overridden (no human delays)
+- Reports clicks/sec, harvest and checkpoint time per click, memory growth and
+  resume time at each depth in BENCH_DEPTHS
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from statistics import mean
+from urllib.parse import urlparse, parse_qs
+
+import psutil
+
+# ============================================================================
+# CONFIGURATION - Can be overridden with environment variables
+# ============================================================================
+BENCH_DEPTHS = [int(d) for d in os.getenv('BENCH_DEPTHS', '100,1000,10000').split(',') if d.strip()]
+BENCH_PORT = int(os.getenv('BENCH_PORT', '8765'))
+BENCH_DEBUG_PORT = int(os.getenv('BENCH_DEBUG_PORT', '9290'))  # Chrome debugging port, clear of a live harvester's 9222
+BENCH_LATENCY_MS = int(os.getenv('BENCH_LATENCY_MS', '50'))  # Server-side delay per request
+BENCH_CARDS_PER_PAGE = int(os.getenv('BENCH_CARDS_PER_PAGE', '20'))
+BENCH_POPUP_EVERY = int(os.getenv('BENCH_POPUP_EVERY', '25'))  # Inject a modal every N pages (0 = never)
+BENCH_KEEP_PACING = os.getenv('BENCH_KEEP_PACING', 'false').lower() == 'true'
+BENCH_REPORT_FILE = os.getenv('BENCH_REPORT_FILE', 'benchmark_report.json')
+BENCH_WORK_DIR = os.getenv('BENCH_WORK_DIR', '') or tempfile.mkdtemp(prefix='thinkspain_bench_')
+
+# The harvester reads its configuration at import time, so point its files at
+# the work dir and (unless asked not to) switch off the deliberate pacing first.
+os.environ.setdefault('LOG_FILE', os.path.join(BENCH_WORK_DIR, 'benchmark_scraper.log'))
+os.environ.setdefault('ERROR_SCREENSHOT_DIR', os.path.join(BENCH_WORK_DIR, 'error_screenshots'))
+os.environ.setdefault('MAX_RUNTIME_HOURS', '1000')
+# Measure raw growth per depth rather than the watchdog's recycling
+os.environ.setdefault('WATCHDOG_MAX_BROWSER_MB', '0')
+os.environ.setdefault('WATCHDOG_LATENCY_FACTOR', '0')
+if not BENCH_KEEP_PACING:
+    os.environ.setdefault('MIN_WAIT_BETWEEN_CLICKS', '0')
+    os.environ.setdefault('MAX_WAIT_BETWEEN_CLICKS', '0')
+    os.environ.setdefault('HUMAN_PACING', 'false')
+    os.environ.setdefault('ADAPTIVE_PACING', 'false')
+
+import production_harvester as ph  # noqa: E402
+
+LISTING_PATH = '/property-for-sale'
+FIRST_PROPERTY_ID = 9000000
+
+
+# ============================================================================
+# MOCK LISTING SERVER
+# ============================================================================
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><title>Mock ThinkSpain - page {page}</title>
+<style>
+.card {{ height: 120px; border: 1px solid #ccc; margin: 4px; }}
+.modal {{ position: fixed; top: 30%; left: 30%; width: 40%; padding: 20px; background: #fff; border: 2px solid #000; z-index: 10; }}
+</style></head>
+<body>
+<div id="listing">{cards}</div>
+{show_more}
+<script>
+document.addEventListener('click', function (e) {{
+    if (e.target.matches('.modal-close')) {{
+        e.target.closest('.modal').remove();
+        return;
+    }}
+    var a = e.target.closest('a.pagination-load-next');
+    if (!a) return;
+    e.preventDefault();
+    fetch(a.href, {{headers: {{'X-Requested-With': 'XMLHttpRequest'}}}})
+        .then(function (r) {{ return r.text(); }})
+        .then(function (html) {{
+            var tpl = document.createElement('template');
+            tpl.innerHTML = html;
+            var next = tpl.content.querySelector('a.pagination-load-next');
+            if (next) {{ a.href = next.getAttribute('href'); next.remove(); }} else {{ a.remove(); }}
+            tpl.content.querySelectorAll('.modal').forEach(function (m) {{ document.body.appendChild(m); }});
+            document.getElementById('listing').appendChild(tpl.content);
+        }});
+}});
+</script>
+</body></html>
+"""
+
+
+def render_cards(page):
+    """Deterministic cards for a page: IDs never repeat across pages"""
+    first = FIRST_PROPERTY_ID + (page - 1) * BENCH_CARDS_PER_PAGE
+    return "".join(
+        f'<article class="card"><a href="{LISTING_PATH}/{pid}?ref=list">Property {pid}</a>'
+        f'<p>€{100000 + pid % 900000:,}</p></article>'
+        for pid in range(first, first + BENCH_CARDS_PER_PAGE)
+    )
+
+
+def render_fragment(page):
+    """What the Show More endpoint returns: cards, optional popup, next cursor"""
+    popup = ''
+    if BENCH_POPUP_EVERY and page % BENCH_POPUP_EVERY == 0:
+        popup = '<div class="modal">Subscribe! <button class="modal-close">x</button></div>'
+    show_more = f'<a class="show-more pagination-load-next" href="{LISTING_PATH}?page={page + 1}">Show More</a>'
+    return render_cards(page) + popup + show_more
+
+
+class MockListingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path.rstrip('/') != LISTING_PATH:
+            self.send_error(404)
+            return
+
+        page = int(parse_qs(parsed.query).get('page', ['1'])[0])
+        if BENCH_LATENCY_MS:
+            time.sleep(BENCH_LATENCY_MS / 1000)
+
+        if self.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            body = render_fragment(page)
+        else:
+            show_more = f'<a class="show-more pagination-load-next" href="{LISTING_PATH}?page={page + 1}">Show More</a>'
+            body = PAGE_TEMPLATE.format(page=page, cards=render_cards(page), show_more=show_more)
+
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server():
+    server = ThreadingHTTPServer(('127.0.0.1', BENCH_PORT), MockListingHandler)
+    threading.Thread(target=server.serve_forever, name='mock-listing-server', daemon=True).start()
+    return server
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def timed(harvester, method_name, samples):
+    """Wrap an instance method so every call's duration lands in `samples`"""
+    original = getattr(harvester, method_name)
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+
+    setattr(harvester, method_name, wrapper)
+
+
+def memory_snapshot(harvester):
+    python_mb = psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024
+    browser_mb, _ = harvester.get_browser_memory_mb()
+    return python_mb, browser_mb
+
+
+def configure_run(depth):
+    """Point the harvester module at a fresh set of files for this depth"""
+    run_dir = os.path.join(BENCH_WORK_DIR, f"depth_{depth}")
+    os.makedirs(run_dir, exist_ok=True)
+    ph.START_URL = f"http://127.0.0.1:{BENCH_PORT}{LISTING_PATH}"
+    ph.MAX_CLICKS = depth
+    ph.OUTPUT_FILE = os.path.join(run_dir, 'harvested_properties.json')
+    ph.PROGRESS_FILE = os.path.join(run_dir, 'scraper_progress.json')
+    ph.JOURNAL_FILE = f"{ph.PROGRESS_FILE}.journal"
+    ph.ID_STORE_FILE = os.path.join(run_dir, 'property_ids.sqlite')
+    ph.OUTPUT_NDJSON_FILE = os.path.join(run_dir, 'harvested_properties.ndjson')
+    ph.OUTPUT_ARCHIVE_DIR = os.path.join(run_dir, 'output_archive')
+    ph.STATS_FILE = os.path.join(run_dir, 'harvester_stats.json')  # Never the live file status.sh reads
+    ph.CHROME_PROFILE_DIR = os.path.join(run_dir, 'chrome_profile')
+    ph.REMOTE_DEBUGGING_PORT = BENCH_DEBUG_PORT
+    ph.MAX_CONSECUTIVE_NO_NEW = depth + 1
+
+
+def benchmark_depth(depth):
+    configure_run(depth)
+    harvester = ph.ProductionHarvester()
+    timings = {'click': [], 'harvest': [], 'checkpoint': []}
+    timed(harvester, 'click_show_more', timings['click'])
+    timed(harvester, 'harvest_property_links', timings['harvest'])
+    timed(harvester, 'save_progress', timings['checkpoint'])
+
+    # Memory baseline is taken once the browser is up and the first page loaded
+    baseline = {}
+    original_restore = harvester.restore_position
+
+    def restore_and_measure(resume_from_click):
+        result = original_restore(resume_from_click)
+        baseline['memory'] = memory_snapshot(harvester)
+        baseline['start'] = time.perf_counter()
+        return result
+
+    harvester.restore_position = restore_and_measure
+    end_memory = {}
+    original_finalize = harvester.finalize
+
+    def finalize_and_measure():
+        end_memory['memory'] = memory_snapshot(harvester)
+        baseline['end'] = time.perf_counter()
+        original_finalize()
+
+    harvester.finalize = finalize_and_measure
+    harvester.run()
+
+    elapsed = baseline.get('end', 0) - baseline.get('start', 0)
+    clicks = harvester.clicks_performed
+
+    # Resume: fresh harvester, same files, time until the browser is back in position
+    resumed = ph.ProductionHarvester()
+    resume_start = time.perf_counter()
+    resumed.load_progress()
+    load_seconds = time.perf_counter() - resume_start
+    resumed.setup_driver()
+    driver_ready = time.perf_counter()
+    resumed.restore_position(resumed.clicks_performed)
+    resume_seconds = time.perf_counter() - driver_ready
+    resumed.cleanup()
+    resumed.journal.close()
+    resumed.property_ids.close()
+    if resumed.output:
+        resumed.output.close()
+    if resumed.recorder:
+        resumed.recorder.close()
+
+    start_py, start_browser = baseline.get('memory', (0, 0))
+    end_py, end_browser = end_memory.get('memory', (0, 0))
+    return {
+        'depth': depth,
+        'clicks': clicks,
+        'properties': len(harvester.property_ids),
+        'elapsed_seconds': round(elapsed, 2),
+        'clicks_per_second': round(clicks / elapsed, 3) if elapsed > 0 else 0,
+        'click_ms_per_click': round(mean(timings['click']) * 1000, 2) if timings['click'] else 0,
+        'harvest_ms_per_click': round(mean(timings['harvest']) * 1000, 2) if timings['harvest'] else 0,
+        'checkpoint_ms_per_click': round(mean(timings['checkpoint']) * 1000, 2) if timings['checkpoint'] else 0,
+        'python_memory_growth_mb': round(end_py - start_py, 1),
+        'browser_memory_growth_mb': round(end_browser - start_browser, 1),
+        'checkpoint_load_seconds': round(load_seconds, 3),
+        'resume_seconds': round(resume_seconds, 2),
+    }
+
+
+def print_report(results):
+    columns = [
+        ('depth', 'Depth'), ('clicks_per_second', 'Clicks/s'), ('click_ms_per_click', 'Click ms'),
+        ('harvest_ms_per_click', 'Harvest ms'), ('checkpoint_ms_per_click', 'Checkpoint ms'),
+        ('python_memory_growth_mb', 'Py +MB'), ('browser_memory_growth_mb', 'Chrome +MB'),
+        ('resume_seconds', 'Resume s'),
+    ]
+    print("=" * 100)
+    print("  ".join(f"{title:>13}" for _, title in columns))
+    for result in results:
+        print("  ".join(f"{result[key]:>13}" for key, _ in columns))
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("HARVESTER BENCHMARK (mock listing server)")
+    print(f"Depths: {BENCH_DEPTHS} | Latency: {BENCH_LATENCY_MS}ms | Cards/page: {BENCH_CARDS_PER_PAGE}")
+    print(f"Work dir: {BENCH_WORK_DIR}")
+    print("=" * 70)
+
+    server = start_mock_server()
+    results = []
+    try:
+        for depth in BENCH_DEPTHS:
+            results.append(benchmark_depth(depth))
+            print_report(results)
+    except KeyboardInterrupt:
+        print("\n⚠ Benchmark interrupted")
+    finally:
+        server.shutdown()
+
+    with open(BENCH_REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'config': {
+            'latency_ms': BENCH_LATENCY_MS,
+            'cards_per_page': BENCH_CARDS_PER_PAGE,
+            'popup_every': BENCH_POPUP_EVERY,
+            'human_pacing': ph.HUMAN_PACING,
+        }, 'results': results}, f, indent=2)
+    print(f"\n✓ Report saved to {BENCH_REPORT_FILE}")
+    sys.exit(0 if results else 1)
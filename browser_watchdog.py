@@ -0,0 +1,50 @@
+"""
+Browser Health Watchdog
+- Tracks the Chrome process tree's RSS and the in-browser latency of each click
+- Latency baseline is the median of the first window of clicks after each (re)launch
+- Asks for a browser recycle when RSS crosses a hard limit or the recent median latency
+  drifts past a multiple of the baseline
+- Enforces a minimum number of clicks between recycles so a slow site can't cause thrashing
+"""
+
+from collections import deque
+from statistics import median
+
+
+class BrowserWatchdog:
+    """Decides when a long-running browser has degraded enough to be relaunched"""
+
+    def __init__(self, max_rss_mb=0, latency_factor=0, window=20, min_clicks=100):
+        self.max_rss_mb = max_rss_mb  # 0 = no memory limit
+        self.latency_factor = latency_factor  # 0 = no latency trend check
+        self.window = max(1, window)
+        self.min_clicks = min_clicks
+        self.reset()
+
+    def reset(self):
+        """Start a fresh baseline for a newly launched browser"""
+        self.baseline_samples = []
+        self.baseline = None
+        self.recent = deque(maxlen=self.window)
+        self.clicks_since_launch = 0
+
+    def observe_click(self, latency):
+        self.clicks_since_launch += 1
+        if self.baseline is None:
+            self.baseline_samples.append(latency)
+            if len(self.baseline_samples) >= self.window:
+                self.baseline = median(self.baseline_samples)
+        else:
+            self.recent.append(latency)
+
+    def recycle_reason(self, browser_rss_mb):
+        """Why the browser should be recycled now, or None"""
+        if self.clicks_since_launch < self.min_clicks:
+            return None
+        if self.max_rss_mb and browser_rss_mb > self.max_rss_mb:
+            return f"browser RSS {browser_rss_mb:.0f} MB over {self.max_rss_mb:.0f} MB"
+        if self.latency_factor and self.baseline and len(self.recent) == self.window:
+            recent = median(self.recent)
+            if recent > self.baseline * self.latency_factor:
+                return f"click latency median {recent:.2f}s vs {self.baseline:.2f}s after launch"
+        return None
@@ -0,0 +1,126 @@
+"""
+Append-only checkpoint journal for the production harvester
+- One JSON line per click with only that click's new property IDs
+- Batched fsync (every N appends) instead of a full rewrite per click
+- Segment rotation so a snapshot can be compacted in the background
+- Replay tolerates a torn last line after a crash
+"""
+
+import json
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(path, data, indent=None):
+    """Write JSON to a temp file, fsync it and atomically replace the target"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CheckpointJournal:
+    """Write-ahead log of per-click checkpoint records"""
+
+    def __init__(self, path, fsync_every=10):
+        self.path = path
+        self.rotated_path = f"{path}.compacting"
+        self.fsync_every = max(1, fsync_every)
+        self._file = None
+        self._unsynced = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._file is None:
+            torn = False
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b'\n'
+            self._file = open(self.path, 'a', encoding='utf-8')
+            # Terminate a torn last line so the next record starts cleanly
+            if torn:
+                self._file.write('\n')
+        return self._file
+
+    def exists(self):
+        """True if any journal segment is on disk"""
+        return os.path.exists(self.path) or os.path.exists(self.rotated_path)
+
+    def replay(self):
+        """Yield records from the rotated segment (if any) then the live segment"""
+        for segment in (self.rotated_path, self.path):
+            if not os.path.exists(segment):
+                continue
+            with open(segment, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn write from a crash can only be the last line
+                        logger.warning(f"Skipping corrupt journal line {line_no} in {segment}")
+
+    def append(self, record):
+        """Append one record, fsyncing every `fsync_every` appends"""
+        with self._lock:
+            f = self._open()
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                os.fsync(f.fileno())
+                self._unsynced = 0
+
+    def sync(self):
+        """Force pending appends to disk"""
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def rotate(self):
+        """Move the live segment aside so it can be folded into a snapshot"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+                self._unsynced = 0
+            if not os.path.exists(self.path):
+                return
+            if os.path.exists(self.rotated_path):
+                # A previous compaction never finished: keep its records too
+                with open(self.rotated_path, 'a', encoding='utf-8') as dst, \
+                        open(self.path, 'r', encoding='utf-8') as src:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+
+    def discard_rotated(self):
+        """Drop the rotated segment once its snapshot is safely on disk"""
+        try:
+            os.remove(self.rotated_path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Flush, fsync and close the live segment"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+                self._unsynced = 0
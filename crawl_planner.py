@@ -0,0 +1,263 @@
+"""
+Crawl Planner - many shallow filtered sub-queries instead of one deep Show More chain
+- Filter dimensions (region, town, price band, property type...) come from PLAN_SPEC_FILE,
+  either as fixed values/ranges or discovered from links on the parent query's first page
+- Each query's size is estimated from the result count on its first page
+- Queries needing more than PLAN_MAX_CLICKS clicks are split by the next dimension
+- The leaf queries become independent resumable jobs run by the sharded crawl coordinator,
+  folding into one shared deduplicated ID store as each job finishes
+- Jobs run to the natural end of their results; the click cap is only a safety limit,
+  and a job that hits it is marked incomplete rather than done
+- Probe results are cached in PLAN_FILE, so re-planning and restarts are cheap
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+# ============================================================================
+# CONFIGURATION - Can be overridden with environment variables
+# ============================================================================
+PLAN_SPEC_FILE = os.getenv('PLAN_SPEC_FILE', 'crawl_dimensions.json')
+PLAN_FILE = os.getenv('PLAN_FILE', 'crawl_plan.json')
+PLAN_MAX_CLICKS = int(os.getenv('PLAN_MAX_CLICKS', '300'))  # Deepest Show More chain allowed per job
+PLAN_SAFETY_FACTOR = float(os.getenv('PLAN_SAFETY_FACTOR', '3'))  # Job click cap = max(estimate, PLAN_MAX_CLICKS) x this
+PLAN_RESULTS_PER_PAGE = int(os.getenv('PLAN_RESULTS_PER_PAGE', '0'))  # 0 = measure from each first page
+PLAN_COUNT_REGEX = os.getenv('PLAN_COUNT_REGEX', r'(\d[\d,.]*)\s+(?:properties|results|listings|homes)\b')
+PLAN_REQUEST_INTERVAL = float(os.getenv('PLAN_REQUEST_INTERVAL', '1.0'))  # Seconds between probe requests
+PLAN_MAX_QUERIES = int(os.getenv('PLAN_MAX_QUERIES', '5000'))  # Safety cap on probed queries
+PLAN_BOOTSTRAP_BROWSER = os.getenv('PLAN_BOOTSTRAP_BROWSER', 'false').lower() == 'true'  # Pass anti-bot checks with Chrome first
+
+# Planned jobs get their own tree and shared store unless told otherwise
+os.environ.setdefault('SHARD_DIR', 'plan_jobs')
+os.environ.setdefault('MERGED_ID_STORE_FILE', 'plan_property_ids.sqlite')
+
+import requests  # noqa: E402
+
+from checkpoint_journal import write_json_atomic  # noqa: E402
+from property_parsing import USER_AGENT, extract_property_hrefs, extract_property_id, extract_result_count  # noqa: E402
+from sharded_crawl import ShardedCrawlCoordinator, logger  # noqa: E402
+
+
+def apply_filter(url, dimension, value):
+    """URL of `url` narrowed by one dimension value (query parameter, range or path segment)"""
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    params = dict(parse_qsl(query))
+    if 'path' in dimension:
+        path = path.rstrip('/') + '/' + dimension['path'].format(value=value).strip('/')
+    elif 'min_param' in dimension:
+        low, high = value
+        if low is not None:
+            params[dimension['min_param']] = str(low)
+        if high is not None:
+            params[dimension['max_param']] = str(high)
+    else:
+        params[dimension['param']] = str(value)
+    return urlunsplit((scheme, netloc, path, urlencode(params), fragment))
+
+
+def value_label(value):
+    if isinstance(value, (list, tuple)):
+        return '-'.join('any' if v is None else str(v) for v in value)
+    return str(value)
+
+
+def job_name(filters):
+    """Stable, filesystem-safe job name, so a re-plan maps onto the same job directory"""
+    if not filters:
+        return 'all'
+    name = '__'.join(f"{f['dimension']}-{value_label(f['value'])}" for f in filters)
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name)[:150]
+
+
+class CrawlPlanner:
+    def __init__(self, spec):
+        self.base_url = spec['base_url']
+        self.dimensions = spec.get('dimensions', [])
+        self.session = None
+        self.last_request_time = 0.0
+        self.probes = {}  # url -> {'count', 'per_page', 'discovered'}
+        self.probed = 0
+        if os.path.exists(PLAN_FILE):
+            with open(PLAN_FILE, 'r', encoding='utf-8') as f:
+                self.probes = json.load(f).get('probes', {})
+
+    def setup_session(self):
+        """Plain session, or one carrying Chrome's cookies when the site needs a browser handshake"""
+        if PLAN_BOOTSTRAP_BROWSER:
+            from http_harvester import HttpPaginationHarvester
+            harvester = HttpPaginationHarvester()
+            if harvester.bootstrap_session():
+                self.session = harvester.session
+                return
+            logger.warning("⚠ Browser bootstrap failed - probing with a plain session")
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Accept-Language': 'en-US,en;q=0.9'})
+
+    def fetch(self, url):
+        wait = self.last_request_time + PLAN_REQUEST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_request_time = time.monotonic()
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        return response.text
+
+    def probe(self, url):
+        """Result count, cards per page and discovered filter values of a query's first page"""
+        if url in self.probes:
+            return self.probes[url]
+        if self.session is None:
+            self.setup_session()
+
+        text = self.fetch(url)
+        self.probed += 1
+        per_page = PLAN_RESULTS_PER_PAGE or len({extract_property_id(h) for h in extract_property_hrefs(text)} - {None})
+        discovered = {}
+        for dimension in self.dimensions:
+            if 'discover' in dimension:
+                values = re.findall(dimension['discover'], text)
+                discovered[dimension['name']] = list(dict.fromkeys(values))
+
+        result = {
+            'count': extract_result_count(text, PLAN_COUNT_REGEX),
+            'per_page': per_page,
+            'discovered': discovered,
+        }
+        self.probes[url] = result
+        return result
+
+    def dimension_values(self, dimension, probe):
+        if 'values' in dimension:
+            return dimension['values']
+        if 'ranges' in dimension:
+            return [tuple(r) for r in dimension['ranges']]
+        return probe['discovered'].get(dimension['name'], [])
+
+    def plan(self):
+        """Breadth-first split until every query fits in PLAN_MAX_CLICKS; returns the job list"""
+        jobs = []
+        queue = deque([(self.base_url, [], 0)])  # (url, filters applied, next dimension index)
+        while queue:
+            url, filters, depth = queue.popleft()
+            if len(self.probes) >= PLAN_MAX_QUERIES and url not in self.probes:
+                logger.warning(f"⚠ PLAN_MAX_QUERIES reached - keeping {url} unsplit")
+                jobs.append(self.make_job(url, filters, None, None, oversized=True))
+                continue
+            try:
+                probe = self.probe(url)
+            except requests.RequestException as e:
+                logger.error(f"Probe failed for {url}: {e} - keeping it as one job")
+                jobs.append(self.make_job(url, filters, None, None, oversized=True))
+                continue
+
+            count, per_page = probe['count'], probe['per_page']
+            if count == 0:
+                logger.info(f"  Empty: {job_name(filters)}")
+                continue
+            if per_page == 0:
+                # Results reported (or unknown) but no listing links parsed: the markup changed, not an empty query
+                logger.warning(f"⚠ No listing links parsed for {job_name(filters)} - keeping it as one job")
+                jobs.append(self.make_job(url, filters, count, None))
+                continue
+            clicks = math.ceil(count / per_page) - 1 if count else None
+
+            if clicks is not None and clicks <= PLAN_MAX_CLICKS:
+                jobs.append(self.make_job(url, filters, count, clicks))
+                continue
+
+            # Too deep (or size unknown): split by the next dimension that has values here
+            children = []
+            while depth < len(self.dimensions) and not children:
+                dimension = self.dimensions[depth]
+                depth += 1
+                children = [
+                    (apply_filter(url, dimension, value), filters + [{'dimension': dimension['name'], 'value': value}], depth)
+                    for value in self.dimension_values(dimension, probe)
+                ]
+            if children:
+                logger.info(f"  Splitting {job_name(filters)} (~{count if count is not None else '?'} results) into {len(children)} by {children[0][1][-1]['dimension']}")
+                queue.extend(children)
+            else:
+                logger.warning(f"⚠ {job_name(filters)} needs ~{clicks if clicks is not None else '?'} clicks and no dimensions are left")
+                jobs.append(self.make_job(url, filters, count, clicks, oversized=True))
+        return jobs
+
+    def make_job(self, url, filters, count, clicks, oversized=False):
+        return {
+            'name': job_name(filters),
+            'start_url': url,
+            'filters': filters,
+            'estimated_results': count,
+            'estimated_clicks': clicks,
+            # Safety limit only: the job normally ends at its last page, well before this
+            'max_clicks': None if clicks is None else math.ceil(max(clicks, PLAN_MAX_CLICKS) * PLAN_SAFETY_FACTOR),
+            'complete_at_cap': False,
+            'oversized': oversized,
+        }
+
+    def save(self, jobs):
+        estimated = [j['estimated_results'] for j in jobs if j['estimated_results']]
+        write_json_atomic(PLAN_FILE, {
+            'planned_at': datetime.now().isoformat(),
+            'base_url': self.base_url,
+            'max_clicks_per_job': PLAN_MAX_CLICKS,
+            'total_jobs': len(jobs),
+            'oversized_jobs': sum(1 for j in jobs if j['oversized']),
+            'estimated_results': sum(estimated),
+            'deepest_job_clicks': max((j['estimated_clicks'] or 0 for j in jobs), default=0),
+            'jobs': jobs,
+            'probes': self.probes,
+        }, indent=2)
+
+
+def load_plan_jobs():
+    with open(PLAN_FILE, 'r', encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    for job in jobs:
+        job['complete_at_cap'] = False  # Hitting the cap means listings were left behind
+    return jobs
+
+
+def build_plan():
+    if not os.path.exists(PLAN_SPEC_FILE):
+        print(f"✗ Dimension spec not found: {PLAN_SPEC_FILE} (see crawl_dimensions.example.json)")
+        raise SystemExit(1)
+    with open(PLAN_SPEC_FILE, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+
+    planner = CrawlPlanner(spec)
+    jobs = planner.plan()
+    planner.save(jobs)
+    logger.info(f"✓ Planned {len(jobs)} jobs ({planner.probed} new probes) -> {PLAN_FILE}")
+    return jobs
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("CRAWL PLANNER")
+    print("=" * 70)
+    print("  python crawl_planner.py --plan      # Probe and write the plan only")
+    print("  python crawl_planner.py             # Plan if needed, then run the jobs")
+    print("  python crawl_planner.py --replan    # Re-plan (cached probes reused), then run")
+    print("  python crawl_planner.py --merge-only")
+    print("=" * 70)
+
+    args = sys.argv[1:]
+    if '--merge-only' in args:
+        ShardedCrawlCoordinator(load_plan_jobs()).merge_outputs()
+    elif '--plan' in args or '--replan' in args or not os.path.exists(PLAN_FILE):
+        jobs = build_plan()
+    else:
+        jobs = load_plan_jobs()
+
+    if '--plan' not in args and '--merge-only' not in args:
+        ShardedCrawlCoordinator(jobs).run()
+
+    print("\n✓ Execution complete!")
@@ -0,0 +1,187 @@
+"""
+Delta Re-crawl - daily refresh that stops at the frontier of known listings
+- Keeps a rolling known-listings index, seeded once from the full crawl's output (JSON or ID store)
+- Crawls a newest-first listing URL with the normal browser harvester
+- Stops once DELTA_STOP_KNOWN_PAGES consecutive batches are entirely known
+- Writes only the delta (new listings) plus listings confirmed removed
+- Removed listings are found by probing a rotating slice of the known IDs each run
+- A completed run adds its new listings to the index and drops the removed ones, so the frontier stays shallow
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+# ============================================================================
+# CONFIGURATION - Can be overridden with environment variables
+# ============================================================================
+DELTA_KNOWN_FILE = os.getenv('DELTA_KNOWN_FILE', 'harvested_properties.json')  # Full crawl's output or .sqlite ID store
+DELTA_KNOWN_STORE_FILE = os.getenv('DELTA_KNOWN_STORE_FILE', 'delta_known_ids.sqlite')  # Rolling index, seeded from DELTA_KNOWN_FILE
+DELTA_START_URL = os.getenv('DELTA_START_URL', os.getenv('START_URL', 'https://www.thinkspain.com/property-for-sale'))  # Newest-first sort order
+DELTA_STOP_KNOWN_PAGES = int(os.getenv('DELTA_STOP_KNOWN_PAGES', '3'))
+DELTA_OUTPUT_FILE = os.getenv('DELTA_OUTPUT_FILE', 'delta_properties.json')
+DELTA_REMOVED_PROBE_LIMIT = int(os.getenv('DELTA_REMOVED_PROBE_LIMIT', '500'))  # Known IDs re-checked per run (0 = off)
+DELTA_PROBE_STATE_FILE = os.getenv('DELTA_PROBE_STATE_FILE', 'delta_probe_state.json')
+DELTA_PROBE_INTERVAL = float(os.getenv('DELTA_PROBE_INTERVAL', '0.5'))  # Seconds between probe requests
+
+# The delta run keeps its own checkpoint so it never clobbers the full crawl's
+os.environ['START_URL'] = DELTA_START_URL
+os.environ.setdefault('PROGRESS_FILE', 'delta_progress.json')
+os.environ.setdefault('OUTPUT_FILE', 'delta_run_properties.json')
+os.environ.setdefault('STATS_FILE', 'delta_stats.json')
+os.environ.setdefault('ID_STORE_FILE', 'delta_property_ids.sqlite')
+os.environ.setdefault('OUTPUT_NDJSON_FILE', 'delta_run_properties.ndjson')
+
+import production_harvester as ph  # noqa: E402
+from production_harvester import ProductionHarvester, logger  # noqa: E402
+from property_parsing import USER_AGENT, extract_property_id, property_url  # noqa: E402
+from checkpoint_journal import write_json_atomic  # noqa: E402
+from id_store import PropertyIdStore  # noqa: E402
+
+
+def load_known_ids():
+    """Open the rolling known-listings index, seeding it from DELTA_KNOWN_FILE on the first run"""
+    if os.path.exists(DELTA_KNOWN_STORE_FILE):
+        return PropertyIdStore(DELTA_KNOWN_STORE_FILE)
+
+    if DELTA_KNOWN_FILE.endswith(('.sqlite', '.db')):
+        known = PropertyIdStore(DELTA_KNOWN_STORE_FILE)
+        known.merge_from(DELTA_KNOWN_FILE)
+    else:
+        with open(DELTA_KNOWN_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        urls = data.get('properties') or data.get('property_links') or []
+        known = PropertyIdStore(DELTA_KNOWN_STORE_FILE)
+        known.add_many(pid for pid in map(extract_property_id, urls) if pid)
+        known.flush()
+    logger.info(f"✓ Seeded {DELTA_KNOWN_STORE_FILE} from {DELTA_KNOWN_FILE}")
+    return known
+
+
+def advance_known_ids(known, new_ids, removed_ids):
+    """Move the frontier forward: the next run treats today's new listings as known"""
+    known.add_many(new_ids)
+    dropped = known.remove_many(removed_ids)
+    known.flush()
+    logger.info(f"✓ Known index updated: +{len(new_ids)} new, -{dropped} removed, {len(known)} total")
+
+
+class DeltaHarvester(ProductionHarvester):
+    def __init__(self, known_ids):
+        super().__init__()
+        self.known_ids = known_ids
+        self.consecutive_known_pages = 0
+        self.stop_reason = None
+
+    def record_hrefs(self, hrefs):
+        """Track whether each batch was entirely made of already-known listings"""
+        batch = {int(pid) for pid in map(extract_property_id, hrefs) if pid}
+        if batch:
+            if all(pid in self.known_ids for pid in batch):
+                self.consecutive_known_pages += 1
+                logger.info(f"  Batch fully known | Consecutive: {self.consecutive_known_pages}/{DELTA_STOP_KNOWN_PAGES}")
+            else:
+                self.consecutive_known_pages = 0
+        return super().record_hrefs(hrefs)
+
+    def extra_stop_reason(self):
+        if self.consecutive_known_pages >= DELTA_STOP_KNOWN_PAGES:
+            self.stop_reason = f"Reached known frontier: {DELTA_STOP_KNOWN_PAGES} consecutive fully-known batches"
+            return self.stop_reason
+        return None
+
+    def delta_ids(self):
+        """IDs harvested this run that were not in the previous run"""
+        return [pid for pid in self.property_ids if pid not in self.known_ids]
+
+
+def probe_removed(known_ids):
+    """Re-check a rotating slice of known listings; return the IDs that are gone"""
+    if not DELTA_REMOVED_PROBE_LIMIT or not known_ids:
+        return [], 0
+
+    import requests
+
+    ordered = list(known_ids)  # The store iterates in sorted order
+    cursor = 0
+    if os.path.exists(DELTA_PROBE_STATE_FILE):
+        with open(DELTA_PROBE_STATE_FILE, 'r', encoding='utf-8') as f:
+            cursor = json.load(f).get('cursor', 0) % len(ordered)
+
+    batch = (ordered + ordered)[cursor:cursor + min(DELTA_REMOVED_PROBE_LIMIT, len(ordered))]
+    removed = []
+    with requests.Session() as session:
+        session.headers['User-Agent'] = USER_AGENT
+        for property_id in batch:
+            try:
+                response = session.get(property_url(property_id), allow_redirects=False, timeout=20)
+                # Gone, or redirected away from the listing to a search page
+                if response.status_code in (404, 410) or (
+                        response.status_code in (301, 302)
+                        and extract_property_id(response.headers.get('Location', '')) != str(property_id)):
+                    removed.append(property_id)
+            except requests.RequestException as e:
+                logger.debug(f"Probe failed for {property_id}: {e}")
+            time.sleep(DELTA_PROBE_INTERVAL)
+
+    write_json_atomic(DELTA_PROBE_STATE_FILE, {'cursor': (cursor + len(batch)) % len(ordered)})
+    logger.info(f"✓ Probed {len(batch)} known listings: {len(removed)} removed")
+    return removed, len(batch)
+
+
+def remove_run_checkpoint():
+    """A finished delta run must start from the top next time, not resume"""
+    for path in (ph.PROGRESS_FILE, ph.JOURNAL_FILE, f"{ph.JOURNAL_FILE}.compacting"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("DELTA RE-CRAWL")
+    print("=" * 70)
+
+    if not os.path.exists(DELTA_KNOWN_STORE_FILE) and not os.path.exists(DELTA_KNOWN_FILE):
+        print(f"✗ Known-listings file not found: {DELTA_KNOWN_FILE}")
+        raise SystemExit(1)
+    if not os.getenv('DELTA_START_URL'):
+        logger.warning(f"⚠ DELTA_START_URL not set - crawling {DELTA_START_URL}; the known frontier only "
+                       f"works on a newest-first listing, so set it to the site's newest-first sort URL")
+
+    known = load_known_ids()
+    logger.info(f"✓ Loaded {len(known)} known listings from {DELTA_KNOWN_STORE_FILE}")
+
+    harvester = DeltaHarvester(known)
+    exit_code = harvester.run()
+
+    new_ids = harvester.delta_ids()
+    completed = exit_code in (ph.EXIT_COMPLETE, ph.EXIT_CLICK_CAP)
+    reached_frontier = exit_code == ph.EXIT_COMPLETE  # A click-capped run stopped short of the known listings
+    removed_ids, probed = probe_removed(known) if completed else ([], 0)
+
+    write_json_atomic(DELTA_OUTPUT_FILE, {
+        'generated_at': datetime.now().isoformat(),
+        'known_properties': len(known),
+        'clicks_performed': harvester.clicks_performed,
+        'stop_reason': harvester.stop_reason,
+        'reached_frontier': reached_frontier,
+        'total_new': len(new_ids),
+        'total_removed': len(removed_ids),
+        'removed_probed': probed,
+        'new_properties': [property_url(pid) for pid in new_ids],
+        'removed_properties': [property_url(pid) for pid in removed_ids],
+    }, indent=2)
+    logger.info(f"✓ Delta saved to {DELTA_OUTPUT_FILE}: {len(new_ids)} new, {len(removed_ids)} removed")
+
+    if completed:
+        if not reached_frontier:
+            # Listings past the cap must still count as new next time, so only removals are applied
+            logger.warning("⚠ Stopped at MAX_CLICKS before the known frontier - known index not advanced")
+        advance_known_ids(known, new_ids if reached_frontier else [], removed_ids)
+        remove_run_checkpoint()
+    known.close()
+
+    print("\n✓ Execution complete!")
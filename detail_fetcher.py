@@ -0,0 +1,361 @@
+"""
+Property Detail Fetcher - second pipeline stage downstream of the harvester
+- Streams new property IDs out of the harvester's SQLite ID store while the crawl is running
+- Resumable SQLite work queue (pending / in_progress / done / gone / failed)
+- asyncio worker pool with bounded concurrency over a pooled keep-alive requests.Session
+- Per-host rate limiting, retry with exponential backoff on 403/429/5xx and network errors
+- Parses price, location, type, bedrooms and size into structured records
+- Writes Parquet part files as it goes, combined into one columnar file at the end
+"""
+
+import asyncio
+import glob
+import logging
+import os
+import signal
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from harvest_metrics import HarvestMetrics
+from log_pipeline import configure_queue_logging
+from property_parsing import RETRYABLE_STATUS, USER_AGENT, parse_property_detail, property_url
+
+# ============================================================================
+# CONFIGURATION - Can be overridden with environment variables
+# ============================================================================
+DETAIL_SOURCE_STORE = os.getenv('DETAIL_SOURCE_STORE', os.getenv('ID_STORE_FILE', 'property_ids.sqlite'))  # Harvester's ID store
+DETAIL_QUEUE_FILE = os.getenv('DETAIL_QUEUE_FILE', 'detail_queue.sqlite')
+DETAIL_PARTS_DIR = os.getenv('DETAIL_PARTS_DIR', 'property_details')
+DETAIL_OUTPUT_FILE = os.getenv('DETAIL_OUTPUT_FILE', 'property_details.parquet')
+DETAIL_STATS_FILE = os.getenv('DETAIL_STATS_FILE', 'detail_stats.json')
+DETAIL_LOG_FILE = os.getenv('DETAIL_LOG_FILE', 'detail_fetcher.log')
+DETAIL_CONCURRENCY = int(os.getenv('DETAIL_CONCURRENCY', '8'))  # Requests in flight
+DETAIL_HOST_INTERVAL = float(os.getenv('DETAIL_HOST_INTERVAL', '0.5'))  # Minimum seconds between requests to one host
+DETAIL_TIMEOUT = float(os.getenv('DETAIL_TIMEOUT', '20'))
+DETAIL_RETRY_ATTEMPTS = int(os.getenv('DETAIL_RETRY_ATTEMPTS', '3'))
+DETAIL_BACKOFF_BASE = float(os.getenv('DETAIL_BACKOFF_BASE', '5'))  # Seconds, doubled per retry
+DETAIL_POLL_INTERVAL = float(os.getenv('DETAIL_POLL_INTERVAL', '15'))  # Seconds between ID store polls
+DETAIL_FLUSH_EVERY = int(os.getenv('DETAIL_FLUSH_EVERY', '500'))  # Records per Parquet part file
+DETAIL_IDLE_EXIT = float(os.getenv('DETAIL_IDLE_EXIT', '900'))  # Exit after this long with no new IDs (0 = exit when drained)
+# Fixed column types so parts with all-missing fields still combine cleanly
+DETAIL_DTYPES = {
+    'id': 'int64', 'url': 'string', 'fetched_at': 'string', 'title': 'string',
+    'price_eur': 'Int64', 'location': 'string', 'property_type': 'string',
+    'bedrooms': 'Int64', 'size_m2': 'float64',
+}
+
+# Setup logging
+configure_queue_logging(DETAIL_LOG_FILE, stream=sys.stdout)
+logger = logging.getLogger(__name__)
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class DetailQueue:
+    """Resumable work queue of property IDs fed from the harvester's ID store"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(QUEUE_SCHEMA)
+
+    def _get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def reset_in_progress(self, retry_failed=False):
+        """Jobs claimed by a previous, interrupted run go back to pending"""
+        statuses = ('in_progress', 'failed') if retry_failed else ('in_progress',)
+        with self.conn:
+            cursor = self.conn.execute(
+                f"UPDATE jobs SET status = 'pending' WHERE status IN ({','.join('?' * len(statuses))})", statuses
+            )
+        return cursor.rowcount
+
+    def ingest(self, store_path):
+        """Queue IDs first seen since the last poll; returns how many were new"""
+        if not os.path.exists(store_path):
+            return 0
+        watermark = self._get_meta('watermark', '')
+        self.conn.execute("ATTACH DATABASE ? AS src", (store_path,))
+        try:
+            with self.conn:
+                # first_seen has second granularity, so re-read the watermark second and ignore repeats
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO jobs (id) SELECT id FROM src.properties WHERE first_seen >= ?",
+                    (watermark,)
+                )
+                added = cursor.rowcount
+                latest = self.conn.execute("SELECT MAX(first_seen) FROM src.properties").fetchone()[0]
+                if latest:
+                    self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)", (latest,))
+        except sqlite3.OperationalError as e:
+            # The harvester may not have created the table yet, or holds a write lock
+            logger.debug(f"ID store not readable yet: {e}")
+            added = 0
+        finally:
+            self.conn.execute("DETACH DATABASE src")
+        return added
+
+    def claim(self, limit):
+        """Mark up to `limit` pending jobs in progress and return their IDs"""
+        with self.conn:
+            ids = [row[0] for row in self.conn.execute(
+                "SELECT id FROM jobs WHERE status = 'pending' ORDER BY id DESC LIMIT ?", (limit,)
+            )]
+            self.conn.executemany(
+                "UPDATE jobs SET status = 'in_progress', updated_at = ? WHERE id = ?",
+                [(datetime.now().isoformat(timespec='seconds'), pid) for pid in ids]
+            )
+        return ids
+
+    def finish(self, results):
+        """Record (id, status, attempts, error) outcomes in one transaction"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts + ?, last_error = ?, updated_at = ? WHERE id = ?",
+                [(status, attempts, error, now, pid) for pid, status, attempts, error in results]
+            )
+
+    def counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.close()
+
+
+class DetailFetcher:
+    def __init__(self, retry_failed=False):
+        self.queue = DetailQueue(DETAIL_QUEUE_FILE)
+        self.metrics = HarvestMetrics()
+        self.retry_failed = retry_failed
+        self.session = None
+        self.work = None
+        self.stop_event = None
+        self.in_flight = 0
+        self.records = []  # Parsed rows awaiting the next Parquet part
+        self.outcomes = []  # Queue updates that become durable with that part
+        self.host_next_slot = {}
+        self.host_locks = {}
+        self.part_number = len(glob.glob(os.path.join(DETAIL_PARTS_DIR, 'part-*.parquet')))
+
+    def setup_session(self):
+        """Pooled keep-alive session sized to the worker pool"""
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=DETAIL_CONCURRENCY)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+
+    async def wait_for_host(self, url):
+        """Per-host rate limit: reserve the next free slot for this host, then sleep until it"""
+        host = urlparse(url).netloc
+        lock = self.host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self.host_next_slot.get(host, 0.0))
+            self.host_next_slot[host] = slot + DETAIL_HOST_INTERVAL
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def fetch_detail(self, property_id):
+        """Fetch and parse one detail page; returns (status, attempts, error, record)"""
+        url = property_url(property_id)
+        error = None
+        for attempt in range(1, DETAIL_RETRY_ATTEMPTS + 1):
+            await self.wait_for_host(url)
+            try:
+                with self.metrics.phase('detail_fetch'):
+                    response = await asyncio.to_thread(self.session.get, url, timeout=DETAIL_TIMEOUT)
+                if response.status_code == 200:
+                    with self.metrics.phase('detail_parse'):
+                        record = await asyncio.to_thread(parse_property_detail, response.text)
+                    return 'done', attempt, None, record
+                if response.status_code in (404, 410):
+                    return 'gone', attempt, f"HTTP {response.status_code}", None
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRYABLE_STATUS:
+                    return 'failed', attempt, error, None
+            except requests.RequestException as e:
+                error = str(e)[:200]
+
+            self.metrics.increment('detail_retries')
+            if attempt < DETAIL_RETRY_ATTEMPTS and not self.stop_event.is_set():
+                await asyncio.sleep(DETAIL_BACKOFF_BASE * (2 ** (attempt - 1)))
+
+        logger.warning(f"  ⚠ Giving up on {property_id}: {error}")
+        return 'failed', DETAIL_RETRY_ATTEMPTS, error, None
+
+    async def worker(self):
+        while True:
+            property_id = await self.work.get()
+            try:
+                if property_id is None:
+                    return
+                self.in_flight += 1
+                try:
+                    status, attempts, error, record = await self.fetch_detail(property_id)
+                except Exception as e:
+                    # A parser bug or unexpected error fails this job, never the worker
+                    logger.error(f"Unexpected error fetching {property_id}: {e}", exc_info=True)
+                    status, attempts, error, record = 'failed', 1, f"{type(e).__name__}: {e}"[:200], None
+                self.metrics.increment(f"detail_{status}")
+                if record is not None:
+                    self.records.append({
+                        'id': property_id,
+                        'url': property_url(property_id),
+                        'fetched_at': datetime.now().isoformat(timespec='seconds'),
+                        **record,
+                    })
+                self.outcomes.append((property_id, status, attempts, error))
+                if len(self.outcomes) >= DETAIL_FLUSH_EVERY:
+                    try:
+                        await self.flush()
+                    except Exception as e:
+                        # Unfinished jobs stay claimed and are re-queued on the next run
+                        logger.error(f"Failed to flush detail records: {e}", exc_info=True)
+            finally:
+                if property_id is not None:
+                    self.in_flight -= 1
+                self.work.task_done()
+
+    async def flush(self):
+        """Write buffered records as a Parquet part, then mark their jobs finished"""
+        records, outcomes = self.records, self.outcomes
+        self.records, self.outcomes = [], []
+        if records:
+            self.part_number += 1
+            path = os.path.join(DETAIL_PARTS_DIR, f"part-{self.part_number:05d}.parquet")
+            with self.metrics.phase('detail_write'):
+                frame = pd.DataFrame(records, columns=list(DETAIL_DTYPES)).astype(DETAIL_DTYPES)
+                await asyncio.to_thread(frame.to_parquet, path, index=False)
+            logger.info(f"✓ Wrote {len(records)} records to {path}")
+        if outcomes:
+            self.queue.finish(outcomes)
+        self.metrics.set_gauge('queue', self.queue.counts())
+        self.metrics.write_stats_file(DETAIL_STATS_FILE)
+
+    async def feed(self):
+        """Poll the ID store and keep the worker queue topped up until idle or stopped"""
+        last_poll = 0.0
+        last_new = time.monotonic()
+        while not self.stop_event.is_set():
+            if time.monotonic() - last_poll >= DETAIL_POLL_INTERVAL:
+                last_poll = time.monotonic()
+                added = self.queue.ingest(DETAIL_SOURCE_STORE)
+                if added:
+                    last_new = last_poll
+                    logger.info(f"✓ Queued {added} new IDs from {DETAIL_SOURCE_STORE}")
+
+            # Keep a couple of batches ahead of the workers without claiming the whole backlog
+            claimed = 0
+            if self.work.qsize() < DETAIL_CONCURRENCY * 2:
+                for property_id in self.queue.claim(DETAIL_CONCURRENCY * 4):
+                    await self.work.put(property_id)
+                    claimed += 1
+
+            if not claimed and self.work.empty() and not self.in_flight:
+                if time.monotonic() - last_new >= DETAIL_IDLE_EXIT:
+                    logger.info("✓ No new IDs and queue drained - stopping")
+                    return
+
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_async(self):
+        self.stop_event = asyncio.Event()
+        self.work = asyncio.Queue(maxsize=DETAIL_CONCURRENCY * 8)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        workers = [asyncio.create_task(self.worker()) for _ in range(DETAIL_CONCURRENCY)]
+        try:
+            await self.feed()
+        finally:
+            # Drop claimed-but-unstarted jobs; they go back to pending on the next run
+            while not self.work.empty():
+                self.work.get_nowait()
+                self.work.task_done()
+            for _ in workers:
+                await self.work.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self.flush()
+
+    def request_stop(self):
+        logger.warning("\n⚠ Stop requested - finishing in-flight requests...")
+        self.stop_event.set()
+
+    def combine_parts(self):
+        """Combine all part files into DETAIL_OUTPUT_FILE, keeping the latest record per ID"""
+        parts = sorted(glob.glob(os.path.join(DETAIL_PARTS_DIR, 'part-*.parquet')))
+        if not parts:
+            return 0
+        combined = pd.concat((pd.read_parquet(p) for p in parts), ignore_index=True)
+        combined = combined.drop_duplicates(subset='id', keep='last').sort_values('id')
+        tmp_path = f"{DETAIL_OUTPUT_FILE}.tmp"
+        combined.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, DETAIL_OUTPUT_FILE)
+        logger.info(f"✓ Combined {len(parts)} parts into {DETAIL_OUTPUT_FILE}: {len(combined)} properties")
+        return len(combined)
+
+    def run(self):
+        """Resume the queue, fetch until idle or stopped, then combine the output"""
+        os.makedirs(DETAIL_PARTS_DIR, exist_ok=True)
+        requeued = self.queue.reset_in_progress(retry_failed=self.retry_failed)
+        if requeued:
+            logger.info(f"✓ Resumed: {requeued} interrupted jobs back in the queue")
+        self.setup_session()
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            logger.warning("\n⚠ Interrupted by user (Ctrl+C)")
+        finally:
+            self.session.close()
+            self.combine_parts()
+            counts = self.queue.counts()
+            self.queue.close()
+            logger.info(f"Queue: {counts}")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("PROPERTY DETAIL FETCHER")
+    print("=" * 70)
+    print(f"Following {DETAIL_SOURCE_STORE} - run alongside the harvester to overlap")
+    print("detail scraping with link discovery. Ctrl+C stops gracefully.")
+    print("=" * 70)
+
+    DetailFetcher(retry_failed='--retry-failed' in sys.argv).run()
+
+    print("\n✓ Execution complete!")
@@ -0,0 +1,89 @@
+"""
+Asynchronous Error Artifact Capture
+- Screenshots (and optionally page source) are taken on a background thread, never inline
+- Global rate limit: at most one capture per `min_interval` seconds
+- Per-error-type dedup: a type already captured within `dedup_seconds` is skipped
+- Small bounded queue; requests are dropped (and counted) rather than ever blocking the caller
+"""
+
+import os
+import queue
+import re
+import threading
+import time
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def error_type(context):
+    """Group contexts like 'click_1234' under one dedup key ('click')"""
+    return re.sub(r'[_\-]?\d+$', '', context or '') or 'error'
+
+
+class ErrorCapture:
+    """Rate-limited, deduplicated screenshot/page-source capture off the caller's thread"""
+
+    def __init__(self, get_driver, out_dir, metrics, min_interval=15, dedup_seconds=600,
+                 page_source=True, queue_size=4):
+        self.get_driver = get_driver  # Called on the worker thread, so a recycled driver is picked up
+        self.out_dir = out_dir
+        self.metrics = metrics
+        self.min_interval = min_interval
+        self.dedup_seconds = dedup_seconds
+        self.page_source = page_source
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.last_capture = 0.0
+        self.last_by_type = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, name='error-capture', daemon=True).start()
+
+    def capture(self, context, detail=""):
+        """Request a capture; returns True if it was queued, False if throttled/deduplicated"""
+        kind = error_type(context)
+        now = time.monotonic()
+        with self._lock:
+            if now - self.last_by_type.get(kind, -self.dedup_seconds) < self.dedup_seconds \
+                    or now - self.last_capture < self.min_interval:
+                self.metrics.increment('captures_suppressed')
+                return False
+            try:
+                self.queue.put_nowait((context, detail, datetime.now()))
+            except queue.Full:
+                self.metrics.increment('captures_dropped')
+                return False
+            self.last_capture = now
+            self.last_by_type[kind] = now
+        return True
+
+    def _run(self):
+        while True:
+            context, detail, when = self.queue.get()
+            try:
+                self._write_artifacts(context, detail, when)
+            except Exception as e:
+                logger.warning(f"Failed to capture error artifacts for {context}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def drain(self, timeout=10):
+        """Give queued captures a chance to finish (e.g. before the browser is closed)"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    def _write_artifacts(self, context, detail, when):
+        driver = self.get_driver()
+        if not driver:
+            return
+        stem = os.path.join(self.out_dir, f"error_{when:%Y%m%d_%H%M%S}_{context}")
+        with self.metrics.phase('error_capture'):
+            driver.save_screenshot(f"{stem}.png")
+            self.metrics.increment('screenshots')
+            if self.page_source:
+                with open(f"{stem}.html", 'w', encoding='utf-8') as f:
+                    if detail:
+                        f.write(f"<!-- {detail.replace('--', '- -')} -->\n")
+                    f.write(driver.page_source)
+        logger.info(f"  Error artifacts saved: {stem}.png{' + .html' if self.page_source else ''}")
@@ -0,0 +1,76 @@
+"""
+Harvest Archive - record raw per-click input for offline re-extraction
+- One record per click: the new-cards HTML (browser) or raw pagination response (HTTP),
+  plus the hrefs the live pipeline extracted from it
+- Chunked gzip JSONL files (chunk-00001.jsonl.gz, ...) rolled every N records
+- Readers tolerate a truncated last chunk from a crash
+"""
+
+import glob
+import gzip
+import json
+import os
+import zlib
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+CHUNK_PATTERN = 'chunk-*.jsonl.gz'
+
+
+class HarvestRecorder:
+    """Append-only writer of chunked, compressed click records"""
+
+    def __init__(self, archive_dir, chunk_records=500):
+        self.archive_dir = archive_dir
+        self.chunk_records = max(1, chunk_records)
+        os.makedirs(archive_dir, exist_ok=True)
+        # Never append to an existing chunk: a resumed run starts the next one
+        self.chunk_number = len(list_chunks(archive_dir))
+        self.chunk_count = 0
+        self.recorded = 0
+        self._file = None
+
+    def record(self, click, source, html, hrefs, url=None):
+        """Store one click's raw input and the hrefs extracted from it live"""
+        if self._file is None:
+            self.chunk_number += 1
+            path = os.path.join(self.archive_dir, f"chunk-{self.chunk_number:05d}.jsonl.gz")
+            self._file = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+        self._file.write(json.dumps({
+            'click': click,
+            'source': source,
+            'url': url,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'hrefs': hrefs,
+            'html': html,
+        }, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.chunk_count += 1
+        self.recorded += 1
+        if self.chunk_count >= self.chunk_records:
+            self.close()
+
+    def close(self):
+        """Finish the current chunk so it is a complete gzip member"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.chunk_count = 0
+
+
+def list_chunks(archive_dir):
+    return sorted(glob.glob(os.path.join(archive_dir, CHUNK_PATTERN)))
+
+
+def iter_chunk(path):
+    """Yield the records of one chunk, stopping cleanly at a truncated tail"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping torn record in {path}")
+    except (EOFError, gzip.BadGzipFile, zlib.error):
+        logger.warning(f"{path} is truncated - using the records before the break")
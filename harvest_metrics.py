@@ -0,0 +1,187 @@
+"""
+Harvest Loop Instrumentation
+- Per-phase latency histograms (popups, button lookup, pacing, content wait, harvest, checkpoint...)
+- Counters (clicks, retries, screenshots, popups closed, new IDs) and gauges (Chrome RSS...)
+- Lightweight local HTTP endpoint: GET /metrics (JSON) or /metrics?format=prometheus
+- Periodic JSON stats file for status.sh and external monitoring
+"""
+
+import json
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from checkpoint_journal import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (0, 1, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """Fixed-bucket histogram with count/sum/min/max and bucket-estimated quantiles"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.total, 4),
+            'mean': round(self.total / self.count, 4) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                '+Inf': self.counts[-1],
+            },
+        }
+
+
+class HarvestMetrics:
+    """Thread-safe registry of histograms, counters and gauges for one harvester"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.server = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of the harvest loop into the `name` latency histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.time() - self.started
+            clicks = self.counters.get('clicks', 0)
+            return {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'uptime_seconds': round(uptime, 1),
+                'clicks_per_minute': round(clicks / uptime * 60, 3) if uptime > 0 else 0,
+                'new_ids_per_minute': round(self.counters.get('new_ids', 0) / uptime * 60, 2) if uptime > 0 else 0,
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {name: h.snapshot() for name, h in self.histograms.items()},
+            }
+
+    def prometheus(self):
+        """Render the snapshot in Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in snapshot['counters'].items():
+            lines.append(f"harvester_{name}_total {value}")
+        for name, value in snapshot['gauges'].items():
+            if isinstance(value, (int, float)):
+                lines.append(f"harvester_{name} {value}")
+        for name, h in snapshot['histograms'].items():
+            cumulative = 0
+            for bound, count in h['buckets'].items():
+                cumulative += count
+                lines.append(f'harvester_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"harvester_{name}_sum {h['sum']}")
+            lines.append(f"harvester_{name}_count {h['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_stats_file(self, path):
+        try:
+            write_json_atomic(path, self.snapshot(), indent=2)
+        except Exception as e:
+            logger.debug(f"Could not write stats file: {e}")
+
+    def start_server(self, host, port):
+        """Serve /metrics from a daemon thread; port 0 disables the endpoint"""
+        if not port:
+            return
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                if parse_qs(parsed.query).get('format') == ['prometheus']:
+                    body, content_type = metrics.prometheus(), 'text/plain; version=0.0.4'
+                else:
+                    body, content_type = json.dumps(metrics.snapshot(), indent=2), 'application/json'
+                payload = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            logger.warning(f"Metrics endpoint disabled - cannot bind {host}:{port}: {e}")
+            return
+        threading.Thread(target=self.server.serve_forever, name='metrics-endpoint', daemon=True).start()
+        logger.info(f"✓ Metrics endpoint: http://{host}:{port}/metrics")
+
+    def stop_server(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
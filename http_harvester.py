@@ -0,0 +1,220 @@
+"""
+HTTP Pagination Harvester - browser-free fast path
+- Uses Chrome once to pass consent/anti-bot checks and capture cookies + user agent
+- Follows the Show More (pagination-load-next) fragment URLs over a pooled keep-alive requests.Session
+- Parses property IDs and the next cursor with precompiled regexes (no DOM)
+- Shares the checkpoint journal, output format and stop conditions with production_harvester.py,
+  so a crawl can switch between engines and resume from the same cursor
+"""
+
+import os
+import sys
+import time
+import random
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import production_harvester as ph
+from production_harvester import ProductionHarvester, logger
+from property_parsing import RETRYABLE_STATUS, extract_property_hrefs, extract_next_page_href, reports_no_results
+
+# ============================================================================
+# CONFIGURATION - Can be overridden with environment variables
+# ============================================================================
+HTTP_MIN_INTERVAL = float(os.getenv('HTTP_MIN_INTERVAL', '0.5'))  # Minimum seconds between requests
+HTTP_MAX_JITTER = float(os.getenv('HTTP_MAX_JITTER', '0.25'))  # Extra random delay per request
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '20'))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '4'))
+HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '5'))  # Seconds, doubled per retry on 403/429/5xx
+
+
+class HttpPaginationHarvester(ProductionHarvester):
+    def __init__(self):
+        super().__init__()
+        self.session = None
+        self.last_request_time = 0.0
+
+    def bootstrap_session(self):
+        """Load the start page in Chrome once and copy its cookies into a pooled session"""
+        if not self.setup_driver():
+            return False
+        try:
+            if not self.load_page(ph.START_URL):
+                return False
+
+            user_agent = self.driver.execute_script("return navigator.userAgent")
+            cookies = self.driver.get_cookies()
+
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+            self.session.headers.update({
+                'User-Agent': user_agent,
+                'Accept': 'text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.9',
+                'Referer': ph.START_URL,
+                'X-Requested-With': 'XMLHttpRequest',
+            })
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain'), path=cookie.get('path', '/')
+                )
+
+            logger.info(f"✓ HTTP session bootstrapped with {len(cookies)} cookies")
+            return True
+        finally:
+            # The browser is only needed for the handshake
+            self.cleanup()
+            self.driver = None
+
+    def wait_for_rate_limit(self):
+        """Keep at least HTTP_MIN_INTERVAL (+ jitter) between requests"""
+        interval = HTTP_MIN_INTERVAL + random.uniform(0, HTTP_MAX_JITTER)
+        wait = self.last_request_time + interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_request_time = time.monotonic()
+
+    def fetch(self, url):
+        """GET a pagination fragment with retry and exponential backoff"""
+        for attempt in range(ph.RETRY_ATTEMPTS):
+            self.wait_for_rate_limit()
+            try:
+                with self.metrics.phase('fetch'):
+                    response = self.session.get(url, timeout=HTTP_TIMEOUT)
+                if response.status_code == 200:
+                    return response.text
+                if response.status_code not in RETRYABLE_STATUS:
+                    logger.error(f"HTTP {response.status_code} for {url} - not retrying")
+                    return None
+                logger.warning(f"HTTP {response.status_code} (attempt {attempt + 1}/{ph.RETRY_ATTEMPTS})")
+            except requests.RequestException as e:
+                logger.warning(f"Request attempt {attempt + 1}/{ph.RETRY_ATTEMPTS} failed: {e}")
+
+            if attempt < ph.RETRY_ATTEMPTS - 1:
+                self.metrics.increment('fetch_retries')
+                time.sleep(HTTP_BACKOFF_BASE * (2 ** attempt))
+
+        logger.error(f"Failed to fetch {url} after {ph.RETRY_ATTEMPTS} attempts")
+        return None
+
+    def harvest_page(self, url, click):
+        """Fetch one page/fragment as click number `click`, record its property IDs and advance the cursor"""
+        text = self.fetch(url)
+        if text is None:
+            return False
+        hrefs = extract_property_hrefs(text)
+        next_page_url = extract_next_page_href(text, url)
+
+        # Same rule as the browser engine: no cursor is only the end if the page was a real results page
+        if not hrefs and not next_page_url and not reports_no_results(text, ph.EMPTY_RESULTS_REGEX):
+            logger.warning(f"No listings and no cursor in {url} (challenge or consent page?) - keeping the cursor")
+            return False
+
+        # Number the page like the browser engine, which counts the click before harvesting it
+        self.clicks_performed = click
+        if self.recorder:
+            self.recorder.record(click, 'http', text, hrefs, url=url)
+        self.record_hrefs(hrefs)
+        self.next_page_url = next_page_url
+        return True
+
+    def run(self):
+        """Main HTTP pagination loop with the same stop conditions as the browser engine; returns an EXIT_* code"""
+        try:
+            self.metrics.start_server(ph.METRICS_HOST, ph.METRICS_PORT)
+            self.load_progress()
+
+            if not self.bootstrap_session():
+                logger.error("Failed to bootstrap HTTP session. Exiting.")
+                return self.exit_code
+
+            # Fresh start: the start page itself carries the first batch and cursor
+            if self.clicks_performed == 0 or not self.next_page_url:
+                logger.info("\nHarvesting start page...")
+                if not self.harvest_page(ph.START_URL, self.clicks_performed):
+                    return self.exit_code
+                self.save_progress()
+
+            logger.info(f"\nStarting HTTP pagination loop (target: {ph.MAX_CLICKS} pages)...\n")
+
+            while self.clicks_performed < ph.MAX_CLICKS:
+                if self.shutdown_requested:
+                    logger.warning("Shutdown requested. Saving and exiting...")
+                    break
+
+                if self.check_runtime_limit():
+                    logger.warning("Runtime limit exceeded. Saving and exiting...")
+                    break
+
+                if self.consecutive_no_new >= ph.MAX_CONSECUTIVE_NO_NEW:
+                    logger.info(f"✓ Reached limit: {ph.MAX_CONSECUTIVE_NO_NEW} consecutive pages with no new links")
+                    self.exit_code = ph.EXIT_COMPLETE
+                    break
+
+                # Mode-specific stop conditions (e.g. delta crawl frontier)
+                stop_reason = self.extra_stop_reason()
+                if stop_reason:
+                    logger.info(f"✓ {stop_reason}")
+                    self.exit_code = ph.EXIT_COMPLETE
+                    break
+
+                url = self.next_page_url
+                if not url:
+                    logger.info("✓ No further pagination cursor - reached the last page")
+                    self.exit_code = ph.EXIT_COMPLETE
+                    break
+
+                # Each fragment is the equivalent of one Show More click
+                if not self.harvest_page(url, self.clicks_performed + 1):
+                    logger.warning("Failed to fetch next page. Stopping...")
+                    break
+                self.metrics.increment('clicks')
+                self.save_progress()
+
+                if self.clicks_performed % ph.STATS_EVERY == 0:
+                    self.update_stats()
+
+                if self.clicks_performed % 50 == 0:
+                    runtime = (datetime.now() - self.start_time).total_seconds()
+                    logger.info(f"\n--- Progress Report ---")
+                    logger.info(f"Pages: {self.clicks_performed}/{ph.MAX_CLICKS}")
+                    logger.info(f"Properties: {len(self.property_ids)}")
+                    logger.info(f"Runtime: {runtime / 60:.1f} min")
+                    logger.info(f"---\n")
+            else:
+                logger.info(f"✓ Reached MAX_CLICKS ({ph.MAX_CLICKS})")
+                self.exit_code = ph.EXIT_CLICK_CAP
+
+        except KeyboardInterrupt:
+            logger.warning("\n⚠ Interrupted by user (Ctrl+C)")
+            self.exit_code = ph.EXIT_INCOMPLETE
+
+        except Exception as e:
+            logger.error(f"Unexpected error in HTTP loop: {e}", exc_info=True)
+            self.exit_code = ph.EXIT_INCOMPLETE
+
+        finally:
+            self.finalize()
+            if self.session:
+                self.session.close()
+        return self.exit_code
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("HTTP PAGINATION HARVESTER")
+    print("=" * 70)
+    print("Press Ctrl+C to stop gracefully at any time")
+    print("=" * 70)
+
+    if '--fresh' in sys.argv:
+        for path in ph.remove_checkpoint_files():
+            print(f"  Removed {path}")
+
+    harvester = HttpPaginationHarvester()
+    sys.exit(harvester.run())
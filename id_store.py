@@ -0,0 +1,187 @@
+"""
+Compact Property ID Store
+- IDs kept as 64-bit integers in a sorted array (8 bytes/ID) plus a small pending set
+- Backed by a SQLite index file with first-seen / last-seen timestamps and first-seen click
+- O(log n) membership checks, batched upserts, bulk merge of other stores
+- Streaming export to the harvested_properties.json format without building a list of URLs
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import logging
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from heapq import merge
+
+from property_parsing import property_url
+
+logger = logging.getLogger(__name__)
+
+PENDING_MERGE_THRESHOLD = 4096  # Fold pending IDs into the sorted array past this size
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS properties (
+    id INTEGER PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    first_click INTEGER
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO properties (id, first_seen, last_seen, first_click) VALUES (?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)
+"""
+
+MERGE_SQL = """
+INSERT INTO properties (id, first_seen, last_seen, first_click)
+SELECT id, first_seen, last_seen, first_click FROM other.properties WHERE true
+ON CONFLICT(id) DO UPDATE SET
+    first_click = CASE WHEN excluded.first_seen < first_seen THEN excluded.first_click ELSE first_click END,
+    first_seen = MIN(first_seen, excluded.first_seen),
+    last_seen = MAX(last_seen, excluded.last_seen)
+"""
+
+
+class PropertyIdStore:
+    """Integer ID set with an on-disk SQLite index; thread-safe"""
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._ids = array('q')  # Sorted
+        self._pending = set()  # Recent additions not yet folded into _ids
+        self._unflushed = {}  # id -> (seen_at, click) awaiting a DB write
+        self._lock = threading.RLock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(SCHEMA)
+        self._load()
+
+    def _load(self):
+        cursor = self.conn.execute("SELECT id FROM properties ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(65536)
+            if not rows:
+                break
+            self._ids.extend(row[0] for row in rows)
+
+    def _fold_pending(self):
+        if self._pending:
+            self._ids = array('q', merge(self._ids, sorted(self._pending)))
+            self._pending.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids) + len(self._pending)
+
+    def __contains__(self, property_id):
+        property_id = int(property_id)
+        with self._lock:
+            if property_id in self._pending:
+                return True
+            i = bisect_left(self._ids, property_id)
+            return i < len(self._ids) and self._ids[i] == property_id
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def add_many(self, property_ids, click=None, seen_at=None):
+        """Record a batch of sightings; returns the IDs that were new, in input order"""
+        seen_at = seen_at or datetime.now().isoformat(timespec='seconds')
+        new_ids = []
+        with self._lock:
+            for property_id in property_ids:
+                property_id = int(property_id)
+                if property_id not in self:
+                    self._pending.add(property_id)
+                    new_ids.append(property_id)
+                    self._unflushed[property_id] = (seen_at, click)
+                elif property_id not in self._unflushed:
+                    self._unflushed[property_id] = (seen_at, None)
+            if len(self._pending) >= PENDING_MERGE_THRESHOLD:
+                self._fold_pending()
+        return new_ids
+
+    def flush(self):
+        """Write pending sightings to SQLite in one transaction"""
+        with self._lock:
+            if not self._unflushed:
+                return 0
+            rows = [(pid, seen_at, seen_at, click) for pid, (seen_at, click) in self._unflushed.items()]
+            self._unflushed = {}
+            with self.conn:
+                self.conn.executemany(UPSERT_SQL, rows)
+        return len(rows)
+
+    def snapshot(self):
+        """Sorted copy of all IDs, cheap enough to export from another thread"""
+        with self._lock:
+            self._fold_pending()
+            return array('q', self._ids)
+
+    def merge_from(self, other_path):
+        """Bulk-merge another store file, keeping the earliest first_seen / latest last_seen"""
+        self.flush()
+        with self._lock:
+            self.conn.execute("ATTACH DATABASE ? AS other", (other_path,))
+            try:
+                with self.conn:
+                    self.conn.execute(MERGE_SQL)
+            finally:
+                self.conn.execute("DETACH DATABASE other")
+            self._ids = array('q')
+            self._pending.clear()
+            self._load()
+
+    def remove_many(self, property_ids):
+        """Drop IDs (e.g. listings confirmed removed); returns how many were present"""
+        drop = {int(pid) for pid in property_ids}
+        if not drop:
+            return 0
+        with self._lock:
+            self._fold_pending()
+            kept = array('q', (pid for pid in self._ids if pid not in drop))
+            removed = len(self._ids) - len(kept)
+            self._ids = kept
+            for property_id in drop:
+                self._unflushed.pop(property_id, None)
+            with self.conn:
+                self.conn.executemany("DELETE FROM properties WHERE id = ?", ((pid,) for pid in drop))
+        return removed
+
+    def clear(self):
+        """Drop every ID (fresh crawl)"""
+        with self._lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM properties")
+            self._ids = array('q')
+            self._pending.clear()
+            self._unflushed = {}
+
+    def export_json(self, path, **header):
+        """Stream the harvested_properties.json format: header fields + sorted 'properties' URLs"""
+        ids = self.snapshot()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("{\n")
+            for key, value in {'total_properties': len(ids), **header}.items():
+                f.write(f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n")
+            f.write('  "properties": [')
+            for i, property_id in enumerate(ids):
+                f.write(("\n    " if i == 0 else ",\n    ") + json.dumps(property_url(property_id)))
+            f.write("\n  ]\n}" if len(ids) else "]\n}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return len(ids)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,32 @@
+"""
+Non-blocking Logging Pipeline
+- Callers only enqueue records (QueueHandler); formatting and I/O happen on a listener thread
+- Size-based log rotation (RotatingFileHandler) plus console output
+- The listener is stopped (and the queue drained) at interpreter exit
+"""
+
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def configure_queue_logging(log_file, max_bytes=10 * 1024 * 1024, backup_count=5, level=logging.INFO, stream=None):
+    """Route the root logger through a queue to a rotating file + console listener"""
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    console_handler = logging.StreamHandler(stream or sys.stderr)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Only merge args; the listener adds the rest
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
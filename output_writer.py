@@ -0,0 +1,142 @@
+"""
+Streaming Output Writer
+- Appends one NDJSON record per newly harvested property (id, url, first_click, seen_at)
+- All disk I/O happens on a background thread fed by a bounded queue of batches
+- The live file is flushed after every batch, so consumers can `tail -F` it
+- Rotation every N records: the segment is archived as .ndjson.gz and .parquet
+  and a new live file is started under the same name
+"""
+
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+_ROTATE = object()  # Queue marker: rotate the live segment now
+_STOP = object()  # Queue marker: drain, rotate and exit
+
+
+class StreamingOutputWriter:
+    """Background NDJSON writer with bounded buffering and rotating compressed/Parquet exports"""
+
+    def __init__(self, path, archive_dir, rotate_records=50000, queue_size=1000, formats=('gz', 'parquet')):
+        self.path = path
+        self.archive_dir = archive_dir
+        self.rotate_records = max(1, rotate_records)
+        self.formats = tuple(formats)
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.segment_records = self._count_lines(path)
+        self.written = 0
+        self.stalls = 0
+        self._file = None
+        self._thread = None
+
+    @staticmethod
+    def _count_lines(path):
+        # A live segment left by an interrupted run keeps growing toward the same rotation point
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='output-writer', daemon=True)
+            self._thread.start()
+        return self
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Only reached when disk falls a whole queue behind: apply back-pressure
+            self.stalls += 1
+            logger.warning(f"⚠ Output writer queue full ({self.queue.maxsize} batches) - waiting for disk")
+            self.queue.put(item)
+
+    def write(self, records):
+        """Queue a batch of record dicts; returns immediately unless the queue is full"""
+        if records:
+            self._put(records)
+
+    def rotate(self):
+        """Archive the current live segment (e.g. before a fresh crawl)"""
+        self._put(_ROTATE)
+
+    def close(self, timeout=60):
+        """Drain the queue, archive the final segment and stop the thread"""
+        if self._thread is None:
+            return
+        self._put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    self._rotate_segment()
+                    return
+                if item is _ROTATE:
+                    self._rotate_segment()
+                    continue
+                self._write_batch(item)
+            except Exception as e:
+                logger.error(f"Output writer error: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write_batch(self, records):
+        f = self._open()
+        f.write(''.join(json.dumps(r, ensure_ascii=False, separators=(',', ':')) + '\n' for r in records))
+        f.flush()
+        self.segment_records += len(records)
+        self.written += len(records)
+        if self.segment_records >= self.rotate_records:
+            self._rotate_segment()
+
+    def _rotate_segment(self):
+        """Move the live file into the archive and export it; the next batch starts a new file"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        base = os.path.join(self.archive_dir, f"{stem}-{datetime.now():%Y%m%dT%H%M%S}")
+        segment, n = f"{base}.ndjson", 1
+        while os.path.exists(segment) or os.path.exists(f"{segment}.gz"):
+            n += 1
+            segment = f"{base}-{n}.ndjson"
+        os.replace(self.path, segment)
+        self.segment_records = 0
+
+        if 'parquet' in self.formats:
+            try:
+                import pandas as pd
+                pd.read_json(segment, lines=True, dtype={'id': 'int64'}).to_parquet(f"{segment[:-7]}.parquet", index=False)
+            except Exception as e:
+                logger.warning(f"⚠ Parquet export of {segment} failed: {e}")
+
+        if 'gz' in self.formats:
+            with open(segment, 'rb') as src, gzip.open(f"{segment}.gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(segment)
+        logger.info(f"✓ Rotated output segment to {segment}{'.gz' if 'gz' in self.formats else ''}")
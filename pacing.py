@@ -0,0 +1,66 @@
+"""
+Adaptive Click Pacing (AIMD)
+- Replaces the fixed MIN/MAX_WAIT_BETWEEN_CLICKS window with a delay that tracks the site
+- Healthy clicks shrink the delay additively; push-back grows it multiplicatively
+- Push-back signals: content-load latency spikes, load timeouts, click retries,
+  batches with no cards and popups/challenges that had to be dismissed
+- Latency baseline is an EWMA of healthy clicks, so slow-but-steady pages are not penalised
+- Delay always stays within the configured [min, max] bounds, with a little jitter
+"""
+
+import random
+
+BACKOFF_FLOOR = 0.5  # Seconds; multiplicative back-off needs a non-zero base when min_delay is 0
+
+
+class AdaptivePacer:
+    """Additive-decrease / multiplicative-increase controller for the inter-click delay"""
+
+    def __init__(self, min_delay, max_delay, initial_delay, decrease_step=0.25,
+                 backoff_factor=2.0, latency_factor=2.5, jitter=0.2, ewma_alpha=0.2):
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self.delay = min(max(initial_delay, self.min_delay), self.max_delay)
+        self.decrease_step = decrease_step
+        self.backoff_factor = backoff_factor
+        self.latency_factor = latency_factor
+        self.jitter = jitter
+        self.ewma_alpha = ewma_alpha
+        self.latency_baseline = None
+        self.backoffs = 0
+        self.last_reason = None
+
+    def pushback_reason(self, latency, loaded, retries, cards, popups):
+        """Name the first push-back signal in this click's outcome, or None if it was healthy"""
+        if retries:
+            return f"{retries} click retr{'y' if retries == 1 else 'ies'}"
+        if not loaded:
+            return "content load timeout"
+        if popups:
+            return f"{popups} popup(s)/challenge(s)"
+        if cards == 0:
+            return "empty batch"
+        if self.latency_baseline and latency > self.latency_baseline * self.latency_factor:
+            return f"latency {latency:.1f}s vs baseline {self.latency_baseline:.1f}s"
+        return None
+
+    def record(self, latency, loaded=True, retries=0, cards=1, popups=0):
+        """Feed one click's outcome (cards = listings that loaded, seen or not); returns the push-back reason"""
+        reason = self.pushback_reason(latency, loaded, retries, cards, popups)
+        if reason:
+            self.delay = min(self.max_delay, max(self.delay, self.min_delay, BACKOFF_FLOOR) * self.backoff_factor)
+            self.backoffs += 1
+        else:
+            self.delay = max(self.min_delay, self.delay - self.decrease_step)
+            # Only healthy clicks move the baseline, so a slowdown can't normalise itself
+            if self.latency_baseline is None:
+                self.latency_baseline = latency
+            else:
+                self.latency_baseline += self.ewma_alpha * (latency - self.latency_baseline)
+        self.last_reason = reason
+        return reason
+
+    def next_delay(self):
+        """Current delay with +/- jitter, clipped to the bounds"""
+        delay = self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(self.max_delay, max(self.min_delay, delay))
@@ -13,6 +13,8 @@ Production Selenium Harvester with Full Error Handling & Resume Support
 """
 
 import undetected_chromedriver as uc
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -28,6 +30,21 @@ from datetime import datetime
 import psutil
 from pathlib import Path
 import random
+import shutil
+import subprocess
+import threading
+import urllib.request
+
+from checkpoint_journal import CheckpointJournal, write_json_atomic
+from property_parsing import USER_AGENT, extract_property_id, property_url, reports_no_results
+from harvest_metrics import HarvestMetrics, COUNT_BUCKETS
+from id_store import PropertyIdStore
+from pacing import AdaptivePacer
+from browser_watchdog import BrowserWatchdog
+from output_writer import StreamingOutputWriter
+from harvest_archive import HarvestRecorder
+from log_pipeline import configure_queue_logging
+from error_capture import ErrorCapture
 
 # ============================================================================
 # CONFIGURATION - Can be overridden with environment variables
@@ -38,45 +55,287 @@ START_URL = os.getenv('START_URL', 'https://www.thinkspain.com/property-for-sale
 OUTPUT_FILE = os.getenv('OUTPUT_FILE', 'harvested_properties.json')
 PROGRESS_FILE = os.getenv('PROGRESS_FILE', 'scraper_progress.json')
 LOG_FILE = os.getenv('LOG_FILE', 'production_scraper.log')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))  # Rotate the log file at this size
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
 ERROR_SCREENSHOT_DIR = os.getenv('ERROR_SCREENSHOT_DIR', 'error_screenshots')
+CAPTURE_MIN_INTERVAL = float(os.getenv('CAPTURE_MIN_INTERVAL', '15'))  # Seconds between any two error captures
+CAPTURE_DEDUP_SECONDS = float(os.getenv('CAPTURE_DEDUP_SECONDS', '600'))  # Capture each error type once per window
+CAPTURE_PAGE_SOURCE = os.getenv('CAPTURE_PAGE_SOURCE', 'true').lower() == 'true'  # Save page HTML with screenshots
+ID_STORE_FILE = os.getenv('ID_STORE_FILE', 'property_ids.sqlite')  # Integer ID index with first/last seen
+JOURNAL_FILE = os.getenv('JOURNAL_FILE', f"{PROGRESS_FILE}.journal")
+JOURNAL_FSYNC_EVERY = int(os.getenv('JOURNAL_FSYNC_EVERY', '10'))  # fsync the journal every N clicks
+JOURNAL_COMPACT_EVERY = int(os.getenv('JOURNAL_COMPACT_EVERY', '100'))  # Snapshot + output rewrite every N clicks
+OUTPUT_NDJSON_FILE = os.getenv('OUTPUT_NDJSON_FILE', 'harvested_properties.ndjson')  # Live record stream ('' = off)
+OUTPUT_ARCHIVE_DIR = os.getenv('OUTPUT_ARCHIVE_DIR', 'output_archive')
+OUTPUT_ROTATE_RECORDS = int(os.getenv('OUTPUT_ROTATE_RECORDS', '50000'))  # Records per NDJSON segment
+OUTPUT_QUEUE_SIZE = int(os.getenv('OUTPUT_QUEUE_SIZE', '1000'))  # Batches buffered for the writer thread
+RECORD_ARCHIVE_DIR = os.getenv('RECORD_ARCHIVE_DIR', '')  # Record per-click raw HTML for replay_harvest.py ('' = off)
+RECORD_CHUNK_RECORDS = int(os.getenv('RECORD_CHUNK_RECORDS', '500'))  # Clicks per compressed archive chunk
+OUTPUT_EXPORT_FORMATS = [f.strip() for f in os.getenv('OUTPUT_EXPORT_FORMATS', 'gz,parquet').split(',') if f.strip()]
 MAX_CONSECUTIVE_NO_NEW = 5  # Stop after 5 consecutive clicks with no new links
 RETRY_ATTEMPTS = 3  # Retry failed clicks 3 times
 CLICK_TIMEOUT = 30  # Maximum seconds to wait for a click to complete
 MAX_RUNTIME_HOURS = int(os.getenv('MAX_RUNTIME_HOURS', '12'))  # Maximum runtime
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))  # Local /metrics endpoint (0 = disabled)
+STATS_FILE = os.getenv('STATS_FILE', 'harvester_stats.json')
+STATS_EVERY = int(os.getenv('STATS_EVERY', '10'))  # Refresh stats file + memory gauges every N clicks
+REMOTE_DEBUGGING_PORT = int(os.getenv('REMOTE_DEBUGGING_PORT', '9222'))  # Must be unique per parallel worker
+
+# Process exit codes: how the run ended (sharded_crawl.py only marks a shard done on a natural end)
+EXIT_COMPLETE = 0  # Last page, no-new limit or a crawl-mode frontier
+EXIT_INCOMPLETE = 1  # Aborted or stopped early (setup failure, runtime limit, shutdown, click failure)
+EXIT_CLICK_CAP = 3  # Stopped at MAX_CLICKS
+
+# Browser reuse across restarts:
+#   fresh      - new uc.Chrome, temporary profile, driver patched every launch (original behaviour)
+#   persistent - new uc.Chrome on a reused profile with the cached patched driver
+#   attach     - attach to a long-lived Chrome on REMOTE_DEBUGGING_PORT (launched detached if
+#                not running) and leave it running on exit, so restarts keep cookies + consent
+BROWSER_MODE = os.getenv('BROWSER_MODE', 'fresh').lower()
+CHROME_PROFILE_DIR = os.getenv('CHROME_PROFILE_DIR', 'chrome_profile')
+DRIVER_CACHE_DIR = os.getenv('DRIVER_CACHE_DIR', '.driver_cache')
+BROWSER_KEEP_ALIVE = os.getenv('BROWSER_KEEP_ALIVE', 'true').lower() == 'true'  # attach mode: leave Chrome running on exit
+BROWSER_ATTACH_TIMEOUT = float(os.getenv('BROWSER_ATTACH_TIMEOUT', '20'))  # Seconds to wait for a launched Chrome
+
+# Browser watchdog: relaunch a degraded Chrome mid-run and seek back to the cursor
+WATCHDOG_MAX_BROWSER_MB = float(os.getenv('WATCHDOG_MAX_BROWSER_MB', '2500'))  # Chrome tree RSS limit (0 = off)
+WATCHDOG_LATENCY_FACTOR = float(os.getenv('WATCHDOG_LATENCY_FACTOR', '3'))  # Recent/baseline click latency limit (0 = off)
+WATCHDOG_WINDOW = int(os.getenv('WATCHDOG_WINDOW', '20'))  # Clicks in the baseline and the recent median
+WATCHDOG_MIN_CLICKS = int(os.getenv('WATCHDOG_MIN_CLICKS', '200'))  # Minimum clicks between recycles
 
 # Realistic timing (human-like behavior)
 MIN_WAIT_BETWEEN_CLICKS = float(os.getenv('MIN_WAIT_BETWEEN_CLICKS', '5'))  # Minimum seconds between clicks
 MAX_WAIT_BETWEEN_CLICKS = float(os.getenv('MAX_WAIT_BETWEEN_CLICKS', '10'))  # Maximum seconds between clicks
-PAGE_LOAD_WAIT = float(os.getenv('PAGE_LOAD_WAIT', '7'))  # Wait for content to load after click
+PAGE_LOAD_WAIT = float(os.getenv('PAGE_LOAD_WAIT', '7'))  # Upper bound (+2s) on waiting for new cards after a click
+CONTENT_SETTLE_MS = int(os.getenv('CONTENT_SETTLE_MS', '300'))  # Quiet period that marks a batch as fully rendered
+HUMAN_PACING = os.getenv('HUMAN_PACING', 'true').lower() == 'true'  # Scroll jitter pauses around each click
+
+# Adaptive pacing: AIMD delay within the MIN/MAX_WAIT_BETWEEN_CLICKS window (false = fixed random window)
+ADAPTIVE_PACING = os.getenv('ADAPTIVE_PACING', 'true').lower() == 'true'
+PACING_MIN_DELAY = float(os.getenv('PACING_MIN_DELAY', str(MIN_WAIT_BETWEEN_CLICKS)))  # Fastest allowed inter-click delay
+PACING_MAX_DELAY = float(os.getenv('PACING_MAX_DELAY', str(MAX_WAIT_BETWEEN_CLICKS)))  # Slowest back-off
+PACING_DECREASE_STEP = float(os.getenv('PACING_DECREASE_STEP', '0.25'))  # Seconds removed per healthy click
+PACING_BACKOFF_FACTOR = float(os.getenv('PACING_BACKOFF_FACTOR', '2.0'))  # Delay multiplier on push-back
+PACING_LATENCY_FACTOR = float(os.getenv('PACING_LATENCY_FACTOR', '2.5'))  # Load time over baseline x this = push-back
+
+# DOM pruning: remove already-harvested cards to keep Chrome memory flat
+PRUNE_DOM = os.getenv('PRUNE_DOM', 'false').lower() == 'true'
+PRUNE_CARD_SELECTOR = os.getenv('PRUNE_CARD_SELECTOR', "article, li, div[class*='card'], div[class*='listing'], div[class*='property']")
+
+# Popup dismissal: ';'-separated CSS selectors of close/accept controls
+DEFAULT_POPUP_SELECTORS = ";".join([
+    "button[class*='cookie']",
+    "button[class*='accept']",
+    "button[class*='close']",
+    "a[class*='close']",
+    ".modal-close",
+    "[aria-label='Close']",
+    ".popup-close",
+    "#close-popup",
+])
+POPUP_SELECTORS = [sel.strip() for sel in os.getenv('POPUP_SELECTORS', DEFAULT_POPUP_SELECTORS).split(';') if sel.strip()]
 
 # Proxy disabled - not needed
 USE_PROXY = False
 
+# Listing selectors
+PROPERTY_LINK_SELECTOR = "a[href*='/property-for-sale/']"
+SHOW_MORE_SELECTOR = "a.show-more.pagination-load-next"
+# Text of a search page that loaded fine but has no listings (ends the crawl rather than failing it)
+EMPTY_RESULTS_REGEX = os.getenv('EMPTY_RESULTS_REGEX', r'\b(?:0|no)\s+(?:properties|results|listings|homes)\b')
+
+# Incremental harvest: a MutationObserver queues property anchors as cards are
+# appended, so each harvest drains only the cards added since the last call in
+# a single round trip instead of re-reading every anchor on the page.
+# With pruning on, the cards returned by the previous call (already recorded on
+# the Python side) are removed first. A card is only removed if it holds a
+# single listing and does not contain the Show More button. With recording on,
+# the outerHTML of the new batch's cards (same single-listing rule, else the
+# anchor itself) is returned for the harvest archive.
+HARVEST_SCRIPT = """
+const [selector, showMoreSelector, prune, cardSelector, record] = arguments;
+let state = window.__thinkspainHarvest;
+if (!state) {
+    state = window.__thinkspainHarvest = {queue: [], harvested: []};
+    const enqueue = (node) => {
+        if (node.nodeType !== 1) return;
+        if (node.matches(selector)) state.queue.push(node);
+        node.querySelectorAll(selector).forEach(a => state.queue.push(a));
+    };
+    document.querySelectorAll(selector).forEach(a => state.queue.push(a));
+    new MutationObserver(mutations => {
+        for (const m of mutations) m.addedNodes.forEach(enqueue);
+    }).observe(document.body, {childList: true, subtree: true});
+}
+const next = document.querySelector(showMoreSelector);
+const idOf = (href) => ((href || '').match(/\\/property-for-sale\\/(\\d+)/) || [])[1];
+const singleCard = (a) => {
+    const card = a.closest(cardSelector);
+    if (!card || card === document.body || (next && card.contains(next))) return null;
+    const id = idOf(a.href);
+    return Array.from(card.querySelectorAll(selector)).every(o => idOf(o.href) === id) ? card : null;
+};
+let pruned = 0;
+if (prune) {
+    for (const a of state.harvested) {
+        if (!a.isConnected) continue;
+        const card = singleCard(a);
+        if (card) {
+            card.remove();
+            pruned++;
+        }
+    }
+}
+const batch = state.queue;
+state.queue = [];
+state.harvested = prune ? batch : [];
+let html = null;
+if (record) {
+    const cards = new Set(batch.map(a => singleCard(a) || a));
+    html = Array.from(cards, el => el.outerHTML).join('\\n');
+}
+return {hrefs: batch.map(a => a.href), next: next ? next.href : null, pruned: pruned, html: html};
+"""
+
+# Popup handling in the page: a persistent MutationObserver auto-dismisses
+# matching overlays as they appear, and each call also sweeps explicitly and
+# returns (then clears) the list of selectors closed since the last call.
+POPUP_SCRIPT = """
+const selectors = arguments[0];
+let state = window.__thinkspainPopups;
+const visible = (el) => (el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+    && getComputedStyle(el).visibility !== 'hidden';
+const sweep = (once) => {
+    for (const sel of state.selectors) {
+        let matches;
+        try { matches = document.querySelectorAll(sel); } catch (e) { continue; }
+        for (const el of matches) {
+            if (!visible(el) || (once && state.clicked.has(el))) continue;
+            state.clicked.add(el);
+            el.click();
+            state.closed.push(sel);
+        }
+    }
+};
+if (!state) {
+    state = window.__thinkspainPopups = {closed: [], selectors: selectors, clicked: new WeakSet(), pending: false};
+    new MutationObserver(() => {
+        if (state.pending) return;
+        state.pending = true;
+        setTimeout(() => { state.pending = false; sweep(true); }, 100);
+    }).observe(document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ['class', 'style']});
+}
+state.selectors = selectors;
+sweep(false);
+const closed = state.closed;
+state.closed = [];
+return closed;
+"""
+
+# Click + wait in one async round trip: resolves as soon as new listing cards
+# have been appended and the DOM has been quiet for CONTENT_SETTLE_MS, or with
+# loaded=false once the timeout expires.
+CLICK_AND_WAIT_SCRIPT = """
+const [button, selector, timeoutMs, settleMs] = arguments;
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+let finished = false;
+let settleTimer = null;
+let observer = null;
+const finish = (loaded) => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timeoutTimer);
+    clearTimeout(settleTimer);
+    done({loaded: loaded, ms: Math.round(performance.now() - start)});
+};
+observer = new MutationObserver(mutations => {
+    for (const m of mutations) {
+        for (const n of m.addedNodes) {
+            if (n.nodeType === 1 && (n.matches(selector) || n.querySelector(selector))) {
+                clearTimeout(settleTimer);
+                settleTimer = setTimeout(() => finish(true), settleMs);
+                return;
+            }
+        }
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+const timeoutTimer = setTimeout(() => finish(false), timeoutMs);
+button.click();
+"""
+
 # ============================================================================
 # SETUP
 # ============================================================================
 os.makedirs(ERROR_SCREENSHOT_DIR, exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Log calls only enqueue; a listener thread formats, writes and rotates
+configure_queue_logging(LOG_FILE, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT)
 logger = logging.getLogger(__name__)
 
 
+def remove_checkpoint_files():
+    """Delete the snapshot, journal segments and ID store so the next run starts from click 0"""
+    removed = []
+    for path in (PROGRESS_FILE, JOURNAL_FILE, f"{JOURNAL_FILE}.compacting",
+                 ID_STORE_FILE, f"{ID_STORE_FILE}-wal", f"{ID_STORE_FILE}-shm"):
+        try:
+            os.remove(path)
+            removed.append(path)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
 class ProductionHarvester:
     def __init__(self):
         self.driver = None
-        self.property_links = set()
+        self.property_ids = PropertyIdStore(ID_STORE_FILE)
         self.clicks_performed = 0
         self.start_time = datetime.now()
         self.shutdown_requested = False
         self.consecutive_no_new = 0
         self.last_checkpoint_click = 0
+        self.next_page_url = None  # Pagination cursor: href of the Show More button
+        self.end_of_results = False  # Show More gone from a page that still has listings
+        self.exit_code = EXIT_INCOMPLETE  # Set to a natural-end code when the run finishes
+        self.unjournaled_ids = []
+        self.journal = CheckpointJournal(JOURNAL_FILE, fsync_every=JOURNAL_FSYNC_EVERY)
+        self.compaction_thread = None
+        self.metrics = HarvestMetrics()
+        self.pacer = AdaptivePacer(
+            PACING_MIN_DELAY, PACING_MAX_DELAY, MIN_WAIT_BETWEEN_CLICKS,
+            decrease_step=PACING_DECREASE_STEP,
+            backoff_factor=PACING_BACKOFF_FACTOR,
+            latency_factor=PACING_LATENCY_FACTOR,
+        )
+        self.last_click = {}  # Outcome of the latest click, fed to the pacer
+        self.last_batch_cards = 0  # Listing links in the latest harvested batch, new or already seen
+        self.watchdog = BrowserWatchdog(
+            max_rss_mb=WATCHDOG_MAX_BROWSER_MB,
+            latency_factor=WATCHDOG_LATENCY_FACTOR,
+            window=WATCHDOG_WINDOW,
+            min_clicks=WATCHDOG_MIN_CLICKS,
+        )
+        self.browser_rss_mb = 0.0
+        self.error_capture = ErrorCapture(
+            lambda: self.driver, ERROR_SCREENSHOT_DIR, self.metrics,
+            min_interval=CAPTURE_MIN_INTERVAL,
+            dedup_seconds=CAPTURE_DEDUP_SECONDS,
+            page_source=CAPTURE_PAGE_SOURCE,
+        )
+        self.recorder = HarvestRecorder(RECORD_ARCHIVE_DIR, RECORD_CHUNK_RECORDS) if RECORD_ARCHIVE_DIR else None
+        self.output = None
+        if OUTPUT_NDJSON_FILE:
+            self.output = StreamingOutputWriter(
+                OUTPUT_NDJSON_FILE, OUTPUT_ARCHIVE_DIR,
+                rotate_records=OUTPUT_ROTATE_RECORDS,
+                queue_size=OUTPUT_QUEUE_SIZE,
+                formats=OUTPUT_EXPORT_FORMATS,
+            ).start()
 
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -88,8 +347,11 @@ class ProductionHarvester:
         logger.info(f"Headed Mode: TRUE (Xvfb virtual display)")
         logger.info(f"Start URL: {START_URL}")
         logger.info(f"Output: {OUTPUT_FILE}")
-        logger.info(f"Timing: {MIN_WAIT_BETWEEN_CLICKS}-{MAX_WAIT_BETWEEN_CLICKS}s between clicks")
-        logger.info(f"Page load wait: {PAGE_LOAD_WAIT}s + random(0-2s)")
+        if ADAPTIVE_PACING:
+            logger.info(f"Timing: adaptive, {PACING_MIN_DELAY}-{PACING_MAX_DELAY}s between clicks (start {self.pacer.delay:.1f}s)")
+        else:
+            logger.info(f"Timing: {MIN_WAIT_BETWEEN_CLICKS}-{MAX_WAIT_BETWEEN_CLICKS}s between clicks")
+        logger.info(f"Content load: event-driven, timeout {PAGE_LOAD_WAIT + 2:.0f}s | Human pacing: {HUMAN_PACING}")
         logger.info(f"Max consecutive no-new: {MAX_CONSECUTIVE_NO_NEW}")
         logger.info(f"Max runtime: {MAX_RUNTIME_HOURS} hours")
         logger.info("=" * 70)
@@ -107,93 +369,289 @@ class ProductionHarvester:
             return True
         return False
 
+    def browser_processes(self):
+        """Chrome / chromedriver processes belonging to this harvester"""
+        processes = {p.pid: p for p in psutil.Process(os.getpid()).children(recursive=True)}
+        if BROWSER_MODE == 'attach':
+            # A reattached Chrome is not our child; find it by its debugging port
+            flag = f'--remote-debugging-port={REMOTE_DEBUGGING_PORT}'
+            for process in psutil.process_iter(['cmdline']):
+                try:
+                    if flag in (process.info['cmdline'] or []):
+                        processes[process.pid] = process
+                        processes.update({c.pid: c for c in process.children(recursive=True)})
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        return list(processes.values())
+
+    def get_browser_memory_mb(self):
+        """Total RSS of the Chrome / chromedriver process tree used by this harvester"""
+        total = 0
+        count = 0
+        for child in self.browser_processes():
+            try:
+                total += child.memory_info().rss
+                count += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / 1024 / 1024, count
+
     def log_memory_usage(self):
-        """Log current memory usage"""
+        """Log current memory usage of Python and the browser process tree"""
         try:
             process = psutil.Process(os.getpid())
             memory_mb = process.memory_info().rss / 1024 / 1024
-            logger.info(f"  Memory usage: {memory_mb:.1f} MB")
+            browser_mb, browser_procs = self.get_browser_memory_mb()
+            logger.info(f"  Memory usage: {memory_mb:.1f} MB (Python) | {browser_mb:.1f} MB (browser, {browser_procs} processes)")
         except Exception as e:
             logger.debug(f"Could not get memory usage: {e}")
 
-    def take_error_screenshot(self, error_context=""):
-        """Take screenshot on error"""
-        try:
-            if self.driver:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{ERROR_SCREENSHOT_DIR}/error_{timestamp}_{error_context}.png"
-                self.driver.save_screenshot(filename)
-                logger.info(f"  Screenshot saved: {filename}")
-        except Exception as e:
-            logger.error(f"Failed to take screenshot: {e}")
+    def take_error_screenshot(self, error_context="", detail=""):
+        """Queue a rate-limited, per-error-type deduplicated screenshot + page source capture"""
+        if self.driver and not self.error_capture.capture(error_context, detail):
+            logger.debug(f"  Capture for {error_context} throttled")
 
 
     def load_progress(self):
-        """Load progress from checkpoint file"""
+        """Load progress from the snapshot + ID store, then replay the journal on top of them"""
+        if not os.path.exists(PROGRESS_FILE) and not self.journal.exists():
+            if len(self.property_ids):
+                logger.warning(f"No checkpoint found - clearing {len(self.property_ids)} IDs from {ID_STORE_FILE} for a fresh crawl")
+                self.property_ids.clear()
+                if self.output:
+                    self.output.rotate()  # Archive the previous crawl's stream
+            return
+
         if os.path.exists(PROGRESS_FILE):
             try:
                 with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     self.clicks_performed = data.get('clicks_performed', 0)
-                    self.property_links = set(data.get('property_links', []))
                     self.consecutive_no_new = data.get('consecutive_no_new', 0)  # Load the counter too
-                    logger.info(f"✓ Resumed from checkpoint: {self.clicks_performed} clicks, {len(self.property_links)} properties, {self.consecutive_no_new} consecutive no-new")
+                    self.next_page_url = data.get('next_page_url')
+
+                    # Older snapshots carried the full URL list: migrate it into the store
+                    legacy_ids = [pid for pid in map(extract_property_id, data.get('property_links', [])) if pid]
+                    if legacy_ids:
+                        self.property_ids.add_many(legacy_ids)
+                        self.property_ids.flush()
+                        logger.info(f"  Migrated {len(legacy_ids)} IDs from legacy snapshot into {ID_STORE_FILE}")
             except Exception as e:
                 logger.error(f"Failed to load progress: {e}")
                 logger.info("Starting fresh...")
 
+        replayed = 0
+        try:
+            for record in self.journal.replay():
+                self.clicks_performed = record.get('clicks_performed', self.clicks_performed)
+                self.consecutive_no_new = record.get('consecutive_no_new', self.consecutive_no_new)
+                self.next_page_url = record.get('next_page_url') or self.next_page_url
+                self.property_ids.add_many(
+                    record.get('new_ids', []), click=record.get('clicks_performed'), seen_at=record.get('seen_at')
+                )
+                replayed += 1
+        except Exception as e:
+            logger.error(f"Failed to replay journal: {e}")
+
+        self.last_checkpoint_click = self.clicks_performed
+        logger.info(f"✓ Resumed from checkpoint: {self.clicks_performed} clicks, {len(self.property_ids)} properties, {self.consecutive_no_new} consecutive no-new ({replayed} journal records replayed)")
+
     def save_progress(self):
-        """Save progress checkpoint"""
+        """Append this click's new IDs to the journal; compact periodically in the background"""
         try:
-            data = {
-                'clicks_performed': self.clicks_performed,
-                'property_links': sorted(list(self.property_links)),
-                'last_updated': datetime.now().isoformat(),
-                'consecutive_no_new': self.consecutive_no_new
-            }
-            with open(PROGRESS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.debug(f"  Progress saved: {self.clicks_performed} clicks")
+            with self.metrics.phase('checkpoint'):
+                self.journal.append({
+                    'clicks_performed': self.clicks_performed,
+                    'consecutive_no_new': self.consecutive_no_new,
+                    'next_page_url': self.next_page_url,
+                    'seen_at': datetime.now().isoformat(timespec='seconds'),
+                    'new_ids': self.unjournaled_ids,
+                })
+                # Publish new IDs to the store at the journal's fsync cadence so
+                # downstream readers (detail_fetcher.py) don't wait for compaction
+                if self.clicks_performed % JOURNAL_FSYNC_EVERY == 0:
+                    self.property_ids.flush()
+            self.unjournaled_ids = []
+            logger.debug(f"  Progress journaled: {self.clicks_performed} clicks")
         except Exception as e:
             logger.error(f"Failed to save progress: {e}")
+            return
+
+        if self.clicks_performed - self.last_checkpoint_click >= JOURNAL_COMPACT_EVERY:
+            self.compact_checkpoint(background=True)
+
+    def compact_checkpoint(self, background=False):
+        """Fold the journal into the ID store + snapshot and rewrite the output file"""
+        if self.compaction_thread and self.compaction_thread.is_alive():
+            if background:
+                return
+            self.compaction_thread.join()
 
-    def save_output(self):
-        """Save harvested links to output file"""
         try:
-            output_data = {
-                'total_properties': len(self.property_links),
-                'clicks_performed': self.clicks_performed,
-                'harvested_at': datetime.now().isoformat(),
-                'properties': sorted(list(self.property_links))
-            }
-            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
-            logger.info(f"✓ Saved {len(self.property_links)} properties to {OUTPUT_FILE}")
+            self.journal.rotate()
         except Exception as e:
-            logger.error(f"Failed to save output: {e}")
+            logger.error(f"Failed to rotate journal: {e}")
+            return
+
+        # Copy the small metadata on the loop thread; store flush and export happen off it
+        clicks = self.clicks_performed
+        consecutive_no_new = self.consecutive_no_new
+        next_page_url = self.next_page_url
+        self.last_checkpoint_click = clicks
+
+        if background:
+            self.compaction_thread = threading.Thread(
+                target=self._write_snapshot,
+                args=(clicks, consecutive_no_new, next_page_url),
+                name="checkpoint-compaction",
+                daemon=True,
+            )
+            self.compaction_thread.start()
+        else:
+            self._write_snapshot(clicks, consecutive_no_new, next_page_url)
 
-    def setup_driver(self):
-        """Setup undetected Chrome with stealth for headed mode"""
-        logger.info("Setting up Chrome driver in headed mode...")
+    def _write_snapshot(self, clicks, consecutive_no_new, next_page_url):
+        """Flush the ID store, write the snapshot + output, then drop the journal segment they cover"""
+        with self.metrics.phase('compaction'):
+            self._write_snapshot_files(clicks, consecutive_no_new, next_page_url)
 
+    def _write_snapshot_files(self, clicks, consecutive_no_new, next_page_url):
         try:
-            options = uc.ChromeOptions()
+            self.property_ids.flush()
+            write_json_atomic(PROGRESS_FILE, {
+                'clicks_performed': clicks,
+                'total_properties': len(self.property_ids),
+                'id_store': ID_STORE_FILE,
+                'last_updated': datetime.now().isoformat(),
+                'consecutive_no_new': consecutive_no_new,
+                'next_page_url': next_page_url
+            }, indent=2)
+            self.journal.discard_rotated()
+            logger.debug(f"  Checkpoint compacted: {clicks} clicks")
+        except Exception as e:
+            logger.error(f"Failed to write snapshot: {e}")
+            return
+        self.save_output(clicks)
 
-            # Chrome options for stability and stealth
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--window-size=1920,1080')
-            options.add_argument('--disable-notifications')
-            options.add_argument('--disable-popup-blocking')
-            options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    def save_output(self, clicks):
+        """Stream harvested links from the ID store to the output file"""
+        try:
+            total = self.property_ids.export_json(
+                OUTPUT_FILE,
+                clicks_performed=clicks,
+                harvested_at=datetime.now().isoformat()
+            )
+            logger.info(f"✓ Saved {total} properties to {OUTPUT_FILE}")
+        except Exception as e:
+            logger.error(f"Failed to save output: {e}")
 
+    def chrome_arguments(self):
+        """Chrome command-line flags shared by every browser mode"""
+        return [
+            # Chrome options for stability and stealth
+            '--disable-blink-features=AutomationControlled',
+            '--disable-dev-shm-usage',
+            '--no-sandbox',
+            '--disable-gpu',
+            '--window-size=1920,1080',
+            '--disable-notifications',
+            '--disable-popup-blocking',
+            f'--user-agent={USER_AGENT}',
             # Additional options for Linux/GCP
-            options.add_argument('--disable-setuid-sandbox')
-            options.add_argument('--remote-debugging-port=9222')
+            '--disable-setuid-sandbox',
+            f'--remote-debugging-port={REMOTE_DEBUGGING_PORT}',
+        ]
+
+    def cached_driver_binary(self):
+        """Path of the patched chromedriver, patching (and downloading) it only once"""
+        name = 'chromedriver.exe' if sys.platform.startswith('win') else 'chromedriver'
+        path = os.path.abspath(os.path.join(DRIVER_CACHE_DIR, name))
+        if not os.path.exists(path):
+            os.makedirs(DRIVER_CACHE_DIR, exist_ok=True)
+            with self.metrics.phase('driver_patch'):
+                patcher = uc.Patcher(version_main=0)
+                patcher.auto()
+            # Copy then rename, so parallel shards never see a half-written binary
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            shutil.copy2(patcher.executable_path, tmp_path)
+            os.replace(tmp_path, path)
+            logger.info(f"✓ Cached patched chromedriver at {path}")
+        return path
+
+    def drop_cached_driver(self):
+        """Forget the cached driver (e.g. after a Chrome update); False in fresh mode, which never uses it"""
+        if BROWSER_MODE == 'fresh':
+            return False
+        shutil.rmtree(DRIVER_CACHE_DIR, ignore_errors=True)
+        return True
 
-            self.driver = uc.Chrome(options=options, version_main=None)
+    def is_debugger_up(self):
+        """True if a Chrome is already listening on REMOTE_DEBUGGING_PORT"""
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{REMOTE_DEBUGGING_PORT}/json/version", timeout=1):
+                return True
+        except OSError:
+            return False
+
+    def launch_detached_chrome(self):
+        """Start a long-lived Chrome on the persistent profile, outside this process's lifetime"""
+        binary = uc.find_chrome_executable()
+        args = [binary, *self.chrome_arguments(), f'--user-data-dir={os.path.abspath(CHROME_PROFILE_DIR)}']
+        subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+        deadline = time.monotonic() + BROWSER_ATTACH_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.is_debugger_up():
+                return
+            time.sleep(0.25)
+        raise WebDriverException(f"Chrome did not open port {REMOTE_DEBUGGING_PORT} within {BROWSER_ATTACH_TIMEOUT:.0f}s")
+
+    def launch_driver(self):
+        """New uc.Chrome; persistent mode reuses the profile and the cached patched driver"""
+        options = uc.ChromeOptions()
+        for argument in self.chrome_arguments():
+            options.add_argument(argument)
+
+        if BROWSER_MODE == 'persistent':
+            return uc.Chrome(
+                options=options,
+                version_main=None,
+                user_data_dir=os.path.abspath(CHROME_PROFILE_DIR),
+                driver_executable_path=self.cached_driver_binary(),
+            )
+        return uc.Chrome(options=options, version_main=None)
+
+    def attach_driver(self):
+        """Attach to the long-lived Chrome on REMOTE_DEBUGGING_PORT, launching it if needed"""
+        if self.is_debugger_up():
+            logger.info(f"✓ Attaching to running Chrome on port {REMOTE_DEBUGGING_PORT}")
+        else:
+            logger.info(f"No Chrome on port {REMOTE_DEBUGGING_PORT} - launching a persistent one...")
+            self.launch_detached_chrome()
+
+        options = webdriver.ChromeOptions()
+        options.debugger_address = f"127.0.0.1:{REMOTE_DEBUGGING_PORT}"
+        service = ChromeService(executable_path=self.cached_driver_binary())
+        return webdriver.Chrome(service=service, options=options)
+
+    def setup_driver(self):
+        """Setup undetected Chrome with stealth for headed mode"""
+        logger.info(f"Setting up Chrome driver in headed mode (browser mode: {BROWSER_MODE})...")
+
+        try:
+            start = time.perf_counter()
+            connect = self.attach_driver if BROWSER_MODE == 'attach' else self.launch_driver
+            try:
+                self.driver = connect()
+            except WebDriverException as e:
+                # A Chrome update makes the cached driver stale: re-patch once and retry
+                if not self.drop_cached_driver():
+                    raise
+                logger.warning(f"⚠ Cached chromedriver rejected, re-patching: {e.msg}")
+                self.driver = connect()
+
+            # Async click-and-wait must be able to outlive its own fallback timeout
+            self.driver.set_script_timeout(PAGE_LOAD_WAIT + 2 + CLICK_TIMEOUT)
 
             # Apply selenium-stealth
             stealth(
@@ -206,7 +664,9 @@ class ProductionHarvester:
                 fix_hairline=True,
             )
 
-            logger.info("✓ Driver setup complete")
+            startup = time.perf_counter() - start
+            self.metrics.observe('driver_startup', startup)
+            logger.info(f"✓ Driver setup complete in {startup:.1f}s")
             return True
 
         except Exception as e:
@@ -215,33 +675,20 @@ class ProductionHarvester:
             return False
 
     def close_popups(self):
-        """Detect and close any popups"""
+        """Dismiss popups in one round trip; returns how many were closed"""
         try:
-            # Common popup patterns
-            popup_selectors = [
-                "button[class*='cookie']",
-                "button[class*='accept']",
-                "button[class*='close']",
-                "a[class*='close']",
-                ".modal-close",
-                "[aria-label='Close']",
-                ".popup-close",
-                "#close-popup"
-            ]
-
-            for selector in popup_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            logger.info(f"  Closed popup: {selector}")
-                            time.sleep(0.5)
-                except:
-                    pass
+            with self.metrics.phase('close_popups'):
+                closed = self.driver.execute_script(POPUP_SCRIPT, POPUP_SELECTORS) or []
+            self.metrics.increment('popups_closed', len(closed))
+            for selector in closed:
+                logger.info(f"  Closed popup: {selector}")
+            if closed:
+                time.sleep(0.5)  # Let the overlay animate out
+            return len(closed)
 
         except Exception as e:
             logger.debug(f"Popup check error: {e}")
+            return 0
 
     def load_page(self, url):
         """Load page with error handling and popup closing"""
@@ -260,9 +707,10 @@ class ProductionHarvester:
 
             except Exception as e:
                 logger.warning(f"Attempt {attempt + 1}/{RETRY_ATTEMPTS} failed: {e}")
+                self.metrics.increment('page_load_retries')
                 if attempt == RETRY_ATTEMPTS - 1:
                     logger.error("Failed to load page after all retries")
-                    self.take_error_screenshot("page_load")
+                    self.take_error_screenshot("page_load", str(e))
                     return False
                 time.sleep(2)
 
@@ -271,93 +719,240 @@ class ProductionHarvester:
     def find_show_more_button(self):
         """Find the Show More button with timeout"""
         try:
-            button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "a.show-more.pagination-load-next"))
-            )
+            with self.metrics.phase('find_show_more_button'):
+                button = WebDriverWait(self.driver, 10).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, SHOW_MORE_SELECTOR))
+                )
             return button
         except TimeoutException:
             return None
 
+    def human_pause(self, low, high):
+        """Deliberate human-like pause; skipped entirely when HUMAN_PACING is off"""
+        if HUMAN_PACING:
+            with self.metrics.phase('human_pause'):
+                time.sleep(random.uniform(low, high))
+
     def click_show_more(self):
         """Click Show More with retry logic and realistic delays"""
 
+        popups = 0
         for attempt in range(RETRY_ATTEMPTS):
             try:
                 # Close any popups that might have appeared
-                self.close_popups()
+                popups += self.close_popups() or 0
 
                 button = self.find_show_more_button()
                 if not button:
+                    # No button at all under a populated (or explicitly empty) listing is the last page, not a failure
+                    if not self.driver.find_elements(By.CSS_SELECTOR, SHOW_MORE_SELECTOR) and (
+                            self.driver.find_elements(By.CSS_SELECTOR, PROPERTY_LINK_SELECTOR)
+                            or reports_no_results(self.driver.page_source, EMPTY_RESULTS_REGEX)):
+                        self.end_of_results = True
+                        return False
                     logger.warning("Show More button not found")
                     return False
 
                 # Random delay before scrolling (human-like)
-                time.sleep(random.uniform(0.5, 1.5))
+                self.human_pause(0.5, 1.5)
 
-                # Scroll into view smoothly
-                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", button)
+                # Scroll into view (smoothly when pacing like a human)
+                behavior = 'smooth' if HUMAN_PACING else 'instant'
+                self.driver.execute_script(f"arguments[0].scrollIntoView({{block: 'center', behavior: '{behavior}'}});", button)
 
                 # Random delay after scrolling
-                time.sleep(random.uniform(0.8, 2.0))
-
-                # Click
-                self.driver.execute_script("arguments[0].click();", button)
+                self.human_pause(0.8, 2.0)
+
+                # Click and wait until the new batch of cards has rendered
+                with self.metrics.phase('content_wait'):
+                    result = self.driver.execute_async_script(
+                        CLICK_AND_WAIT_SCRIPT, button, PROPERTY_LINK_SELECTOR,
+                        int((PAGE_LOAD_WAIT + 2) * 1000), CONTENT_SETTLE_MS
+                    ) or {}
                 self.clicks_performed += 1
+                self.metrics.increment('clicks')
 
                 logger.info(f"✓ Click #{self.clicks_performed} - Show More clicked")
-
-                # Wait for content to load (longer, realistic wait)
-                wait_time = random.uniform(PAGE_LOAD_WAIT, PAGE_LOAD_WAIT + 2)
-                logger.info(f"  Waiting {wait_time:.1f}s for content to load...")
-                time.sleep(wait_time)
+                if result.get('loaded'):
+                    logger.info(f"  Content loaded in {result.get('ms', 0) / 1000:.1f}s")
+                else:
+                    logger.warning(f"  No new cards within {PAGE_LOAD_WAIT + 2:.0f}s")
+                    self.metrics.increment('content_timeouts')
+
+                self.last_click = {
+                    'latency': result.get('ms', 0) / 1000 if result.get('loaded') else PAGE_LOAD_WAIT + 2,
+                    'loaded': bool(result.get('loaded')),
+                    'retries': attempt,
+                    'popups': popups,
+                }
 
                 return True
 
             except Exception as e:
                 logger.warning(f"Click attempt {attempt + 1}/{RETRY_ATTEMPTS} failed: {e}")
+                self.metrics.increment('click_retries')
                 if attempt == RETRY_ATTEMPTS - 1:
                     logger.error(f"Failed to click after {RETRY_ATTEMPTS} attempts")
-                    self.take_error_screenshot(f"click_{self.clicks_performed}")
+                    self.take_error_screenshot(f"click_{self.clicks_performed}", str(e))
                     return False
                 time.sleep(2)
 
         return False
 
+    def next_click_delay(self):
+        """Feed the last click's outcome to the AIMD pacer and return the next delay"""
+        if not ADAPTIVE_PACING:
+            return random.uniform(MIN_WAIT_BETWEEN_CLICKS, MAX_WAIT_BETWEEN_CLICKS)
+
+        reason = self.pacer.record(cards=self.last_batch_cards, **self.last_click)
+        if reason:
+            self.metrics.increment('pacing_backoffs')
+            logger.warning(f"  ⚠ Backing off to {self.pacer.delay:.1f}s: {reason}")
+        self.metrics.set_gauge('pacing_delay', round(self.pacer.delay, 2))
+        return self.pacer.next_delay()
+
     def harvest_property_links(self):
-        """Extract property links from current page"""
+        """Extract property links from cards added since the last harvest"""
         try:
-            links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/property-for-sale/']")
+            with self.metrics.phase('harvest'):
+                result = self.driver.execute_script(
+                    HARVEST_SCRIPT, PROPERTY_LINK_SELECTOR, SHOW_MORE_SELECTOR, PRUNE_DOM, PRUNE_CARD_SELECTOR,
+                    self.recorder is not None
+                ) or {}
+            if result.get('pruned'):
+                logger.debug(f"  Pruned {result['pruned']} harvested cards from the DOM")
+            hrefs = result.get('hrefs') or []
+            if result.get('next'):
+                self.next_page_url = result['next']
+            if self.recorder and result.get('html') is not None:
+                self.recorder.record(self.clicks_performed, 'dom', result['html'], hrefs)
+
+            return self.record_hrefs(hrefs)
 
-            before_count = len(self.property_links)
+        except Exception as e:
+            logger.error(f"Error harvesting links: {e}")
+            self.last_batch_cards = 0
+            self.take_error_screenshot("harvest", str(e))
+            return 0
 
-            for link in links:
-                href = link.get_attribute('href')
-                if href and '/property-for-sale/' in href:
-                    property_id = href.split('/property-for-sale/')[-1].split('?')[0].split('#')[0]
-                    if property_id and property_id.isdigit():
-                        clean_url = f"https://www.thinkspain.com/property-for-sale/{property_id}"
-                        self.property_links.add(clean_url)
+    def record_hrefs(self, hrefs):
+        """Add property IDs from hrefs to the ID store and update the no-new counter"""
+        batch = [pid for pid in map(extract_property_id, hrefs) if pid]
+        self.last_batch_cards = len(batch)
+        seen_at = datetime.now().isoformat(timespec='seconds')
+        new_ids = self.property_ids.add_many(batch, click=self.clicks_performed, seen_at=seen_at)
+        self.unjournaled_ids.extend(new_ids)
+        if self.output:
+            self.output.write([
+                {'id': pid, 'url': property_url(pid), 'first_click': self.clicks_performed, 'seen_at': seen_at}
+                for pid in new_ids
+            ])
+
+        new_count = len(new_ids)
+        self.metrics.increment('new_ids', new_count)
+        self.metrics.observe('new_ids_per_click', new_count, buckets=COUNT_BUCKETS)
+        self.metrics.set_gauge('properties', len(self.property_ids))
+
+        if new_count == 0:
+            self.consecutive_no_new += 1
+            logger.warning(f"  ⚠ No new links | Consecutive: {self.consecutive_no_new}/{MAX_CONSECUTIVE_NO_NEW}")
+        else:
+            self.consecutive_no_new = 0
+            logger.info(f"  Harvested {new_count} new links | Total: {len(self.property_ids)}")
+
+        return new_count
+
+    def extra_stop_reason(self):
+        """Hook for crawl modes that stop early; returns a reason string to stop"""
+        return None
+
+    def update_stats(self):
+        """Refresh memory gauges and write the periodic JSON stats file"""
+        try:
+            self.metrics.set_gauge('clicks_performed', self.clicks_performed)
+            self.metrics.set_gauge('python_rss_mb', round(psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024, 1))
+            browser_mb, browser_procs = self.get_browser_memory_mb()
+            self.browser_rss_mb = browser_mb
+            if self.output:
+                self.metrics.set_gauge('output_queue', self.output.queue.qsize())
+                self.metrics.set_gauge('output_records', self.output.written)
+            self.metrics.set_gauge('browser_rss_mb', round(browser_mb, 1))
+            self.metrics.set_gauge('browser_processes', browser_procs)
+        except Exception as e:
+            logger.debug(f"Could not sample memory: {e}")
+        self.metrics.write_stats_file(STATS_FILE)
 
-            new_count = len(self.property_links) - before_count
+    def seek_to_checkpoint(self):
+        """Load the checkpointed pagination URL directly instead of replaying clicks"""
+        logger.info("=" * 70)
+        logger.info(f"RESUMING: Seeking to checkpoint at click {self.clicks_performed}")
+        logger.info(f"  Cursor: {self.next_page_url}")
+        logger.info("=" * 70)
 
-            if new_count == 0:
-                self.consecutive_no_new += 1
-                logger.warning(f"  ⚠ No new links | Consecutive: {self.consecutive_no_new}/{MAX_CONSECUTIVE_NO_NEW}")
-            else:
-                self.consecutive_no_new = 0
-                logger.info(f"  Harvested {new_count} new links | Total: {len(self.property_links)}")
+        if not self.load_page(self.next_page_url):
+            return False
+
+        # The cursor page must be a real listing page, otherwise fall back to replay
+        if not self.driver.find_elements(By.CSS_SELECTOR, PROPERTY_LINK_SELECTOR):
+            logger.warning("Cursor page has no listings")
+            return False
 
-            return new_count
+        # Loading the cursor page is equivalent to the next Show More click
+        self.clicks_performed += 1
+        logger.info(f"✓ REACHED POSITION: Click {self.clicks_performed}")
+        return True
 
-        except Exception as e:
-            logger.error(f"Error harvesting links: {e}")
-            self.take_error_screenshot("harvest")
-            return 0
+    def replay_clicks(self, resume_from_click):
+        """Fast-forward by clicking Show More until the checkpointed click count"""
+        logger.info("=" * 70)
+        logger.info(f"RESUMING: Fast-forwarding through {resume_from_click} already-clicked pages...")
+        logger.info("(Not harvesting, just clicking to reach last position)")
+        logger.info("=" * 70)
+
+        # click_show_more increments the counter, so count from zero again
+        self.clicks_performed = 0
+        for skip_click in range(resume_from_click):
+            if not self.click_show_more():
+                logger.error(f"Failed to skip to click {skip_click + 1}. Starting from here...")
+                break
+
+            # Short delay during fast-forward (faster than normal)
+            if (skip_click + 1) % 10 == 0:
+                logger.info(f"  Fast-forwarded {skip_click + 1}/{resume_from_click} clicks...")
+            time.sleep(random.uniform(1, 2))  # Faster during resume
+        self.clicks_performed = max(self.clicks_performed, resume_from_click)
+
+        logger.info("=" * 70)
+        logger.info(f"✓ REACHED POSITION: Click {resume_from_click}")
+        logger.info("Now starting fresh harvest from this point...")
+        logger.info("=" * 70)
+        time.sleep(2)
+
+    def restore_position(self, resume_from_click):
+        """Get the browser to the checkpointed position: seek if possible, else replay"""
+        if resume_from_click > 0 and self.next_page_url:
+            if self.seek_to_checkpoint():
+                return True
+            logger.warning("Seek resume failed - falling back to click replay")
+
+        if not self.load_page(START_URL):
+            return False
+
+        # Human-like delay after page loads
+        initial_wait = random.uniform(2, 4)
+        logger.info(f"Waiting {initial_wait:.1f}s for initial page to fully load...")
+        time.sleep(initial_wait)
+
+        if resume_from_click > 0:
+            self.replay_clicks(resume_from_click)
+        return True
 
     def run(self):
-        """Main execution loop with full error handling"""
+        """Main execution loop with full error handling; returns an EXIT_* code"""
 
         try:
+            self.metrics.start_server(METRICS_HOST, METRICS_PORT)
+
             # Load previous progress if resuming
             self.load_progress()
             resume_from_click = self.clicks_performed  # Store how many clicks were already done
@@ -365,46 +960,17 @@ class ProductionHarvester:
             # Setup driver
             if not self.setup_driver():
                 logger.error("Failed to setup driver. Exiting.")
-                return
+                return self.exit_code
 
-            # Load initial page
-            if not self.load_page(START_URL):
+            # Load initial page (or seek straight to the checkpointed position)
+            if not self.restore_position(resume_from_click):
                 logger.error("Failed to load initial page. Exiting.")
-                return
-
-            # Human-like delay after page loads
-            initial_wait = random.uniform(2, 4)
-            logger.info(f"Waiting {initial_wait:.1f}s for initial page to fully load...")
-            time.sleep(initial_wait)
-
-            # RESUME LOGIC: Skip to the page where we left off
-            if resume_from_click > 0:
-                logger.info("=" * 70)
-                logger.info(f"RESUMING: Fast-forwarding through {resume_from_click} already-clicked pages...")
-                logger.info("(Not harvesting, just clicking to reach last position)")
-                logger.info("=" * 70)
-
-                for skip_click in range(resume_from_click):
-                    if not self.click_show_more():
-                        logger.error(f"Failed to skip to click {skip_click + 1}. Starting from here...")
-                        break
-
-                    # Short delay during fast-forward (faster than normal)
-                    if (skip_click + 1) % 10 == 0:
-                        logger.info(f"  Fast-forwarded {skip_click + 1}/{resume_from_click} clicks...")
-                    time.sleep(random.uniform(1, 2))  # Faster during resume
-
-                logger.info("=" * 70)
-                logger.info(f"✓ REACHED POSITION: Click {resume_from_click}")
-                logger.info("Now starting fresh harvest from this point...")
-                logger.info("=" * 70)
-                time.sleep(2)
+                return self.exit_code
 
             # Harvest current page (whether starting fresh or after resume)
             logger.info("\nHarvesting current page...")
             self.harvest_property_links()
-            self.save_progress()  # Save after initial harvest
-            self.save_output()     # Save to output file
+            self.save_progress()  # Journal the initial harvest
 
             # Main clicking loop
             logger.info(f"\nStarting click loop (target: {MAX_CLICKS} clicks)...\n")
@@ -423,34 +989,58 @@ class ProductionHarvester:
                 # Check consecutive no-new threshold
                 if self.consecutive_no_new >= MAX_CONSECUTIVE_NO_NEW:
                     logger.info(f"✓ Reached limit: {MAX_CONSECUTIVE_NO_NEW} consecutive clicks with no new links")
+                    self.exit_code = EXIT_COMPLETE
+                    break
+
+                # Mode-specific stop conditions (e.g. delta crawl frontier)
+                stop_reason = self.extra_stop_reason()
+                if stop_reason:
+                    logger.info(f"✓ {stop_reason}")
+                    self.exit_code = EXIT_COMPLETE
                     break
 
                 # Click Show More
                 if not self.click_show_more():
-                    logger.warning("Failed to click Show More. Stopping...")
+                    if self.end_of_results:
+                        logger.info("✓ No Show More button - reached the last page")
+                        self.exit_code = EXIT_COMPLETE
+                    else:
+                        logger.warning("Failed to click Show More. Stopping...")
                     break
 
                 # Harvest after each click
+                harvest_start = time.perf_counter()
                 self.harvest_property_links()
+                self.watchdog.observe_click(self.last_click.get('latency', 0) + time.perf_counter() - harvest_start)
 
-                # Save progress after EVERY click (as requested)
+                # Journal progress after EVERY click (snapshot + output compacted periodically)
                 self.save_progress()
-                self.save_output()
+
+                if self.clicks_performed % STATS_EVERY == 0:
+                    self.update_stats()
+                    recycle_reason = self.watchdog.recycle_reason(self.browser_rss_mb)
+                    if recycle_reason and not self.recycle_browser(recycle_reason):
+                        logger.error("Failed to recycle browser. Stopping...")
+                        break
 
                 # Progress report every 10 clicks
                 if self.clicks_performed % 10 == 0:
                     logger.info(f"\n--- Progress Report ---")
                     logger.info(f"Clicks: {self.clicks_performed}/{MAX_CLICKS}")
-                    logger.info(f"Properties: {len(self.property_links)}")
+                    logger.info(f"Properties: {len(self.property_ids)}")
                     logger.info(f"Runtime: {(datetime.now() - self.start_time).total_seconds() / 60:.1f} min")
                     self.log_memory_usage()
                     logger.info(f"---\n")
 
-                # Random delay between clicks (human-like behavior)
+                # Delay between clicks: adaptive to the site's push-back, or a fixed random window
                 if self.clicks_performed < MAX_CLICKS:
-                    delay = random.uniform(MIN_WAIT_BETWEEN_CLICKS, MAX_WAIT_BETWEEN_CLICKS)
+                    delay = self.next_click_delay()
                     logger.info(f"  Waiting {delay:.1f}s before next click...")
-                    time.sleep(delay)
+                    with self.metrics.phase('click_delay'):
+                        time.sleep(delay)
+            else:
+                logger.info(f"✓ Reached MAX_CLICKS ({MAX_CLICKS})")
+                self.exit_code = EXIT_CLICK_CAP
 
             # Final harvest
             logger.info("\nFinal harvest...")
@@ -458,53 +1048,115 @@ class ProductionHarvester:
 
         except KeyboardInterrupt:
             logger.warning("\n⚠ Interrupted by user (Ctrl+C)")
+            self.exit_code = EXIT_INCOMPLETE
 
         except Exception as e:
             logger.error(f"Unexpected error in main loop: {e}", exc_info=True)
-            self.take_error_screenshot("main_loop")
+            self.take_error_screenshot("main_loop", str(e))
+            self.exit_code = EXIT_INCOMPLETE
 
         finally:
-            # Always save before exiting
-            logger.info("\n" + "=" * 70)
-            logger.info("FINALIZING")
-            logger.info("=" * 70)
-
+            self.finalize()
+        return self.exit_code
+
+    def recycle_browser(self, reason):
+        """Checkpoint, relaunch the driver and seek back to the cursor without leaving the run"""
+        logger.warning(f"⚠ Watchdog: {reason} - recycling browser at click {self.clicks_performed}")
+        self.metrics.increment('browser_recycles')
+        with self.metrics.phase('browser_recycle'):
+            self.compact_checkpoint()
+            self.quit_browser()
+            if not self.setup_driver() or not self.restore_position(self.clicks_performed):
+                return False
+            self.harvest_property_links()
             self.save_progress()
-            self.save_output()
 
-            # Summary
-            runtime = (datetime.now() - self.start_time).total_seconds() / 60
-            logger.info(f"\n✓ Total clicks: {self.clicks_performed}")
-            logger.info(f"✓ Total properties: {len(self.property_links)}")
-            logger.info(f"✓ Runtime: {runtime:.1f} minutes")
-            logger.info(f"✓ Output saved to: {OUTPUT_FILE}")
-            logger.info(f"✓ Progress saved to: {PROGRESS_FILE}")
+        self.watchdog.reset()
+        self.update_stats()
+        logger.info(f"✓ Browser recycled - continuing from click {self.clicks_performed}")
+        return True
+
+    def quit_browser(self):
+        """Close the browser for good, including a kept-alive attached one"""
+        if not self.driver:
+            return
+        self.error_capture.drain()
+        try:
+            if BROWSER_MODE == 'attach':
+                self.driver.execute_cdp_cmd('Browser.close', {})
+                self.driver.service.stop()
+                # Wait for the port to free up so setup_driver launches a new Chrome
+                deadline = time.monotonic() + BROWSER_ATTACH_TIMEOUT
+                while self.is_debugger_up() and time.monotonic() < deadline:
+                    time.sleep(0.25)
+            else:
+                self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {e}")
+        self.driver = None
+
+    def finalize(self):
+        """Always save before exiting, log a summary and release the browser"""
+        logger.info("\n" + "=" * 70)
+        logger.info("FINALIZING")
+        logger.info("=" * 70)
 
-            # Cleanup
-            self.cleanup()
+        self.save_progress()
+        self.compact_checkpoint()
+        self.journal.close()
+        self.update_stats()
+        self.metrics.stop_server()
+        self.property_ids.close()
+        if self.output:
+            self.output.close()
+        if self.recorder:
+            self.recorder.close()
+
+        # Summary
+        runtime = (datetime.now() - self.start_time).total_seconds() / 60
+        logger.info(f"\n✓ Total clicks: {self.clicks_performed}")
+        logger.info(f"✓ Total properties: {len(self.property_ids)}")
+        logger.info(f"✓ Runtime: {runtime:.1f} minutes")
+        logger.info(f"✓ Output saved to: {OUTPUT_FILE}")
+        logger.info(f"✓ Progress saved to: {PROGRESS_FILE}")
+
+        # Cleanup (let a pending error capture use the browser first)
+        self.error_capture.drain()
+        self.cleanup()
 
     def cleanup(self):
         """Cleanup browser resources"""
         if self.driver:
             try:
-                logger.info("\nClosing browser...")
-                self.driver.quit()
-                logger.info("✓ Browser closed")
+                if BROWSER_MODE == 'attach' and BROWSER_KEEP_ALIVE:
+                    # Stop only our chromedriver; the browser keeps its session for the next run
+                    logger.info("\nDetaching from browser...")
+                    self.driver.service.stop()
+                    logger.info(f"✓ Browser left running on port {REMOTE_DEBUGGING_PORT}")
+                else:
+                    logger.info("\nClosing browser...")
+                    self.driver.quit()
+                    logger.info("✓ Browser closed")
             except Exception as e:
                 logger.error(f"Error closing browser: {e}")
 
-
 if __name__ == "__main__":
     print("=" * 70)
     print("PRODUCTION SELENIUM HARVESTER")
     print("=" * 70)
     print(f"Starting in 3 seconds...")
     print("Press Ctrl+C to stop gracefully at any time")
+    print("Pass --fresh to discard the checkpoint and start from click 0")
     print("=" * 70)
     time.sleep(3)
 
+    if '--fresh' in sys.argv:
+        for path in remove_checkpoint_files():
+            print(f"  Removed {path}")
+
     harvester = ProductionHarvester()
-    harvester.run()
+    exit_code = harvester.run()
 
     print("\n✓ Execution complete!")
+    sys.exit(exit_code)
 
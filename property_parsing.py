@@ -0,0 +1,184 @@
+"""
+Property link parsing shared by the browser and HTTP harvesting engines
+- Property ID extraction from listing hrefs
+- Regex-based href / pagination cursor extraction from raw HTML fragments
+- Structured fields (price, location, type, size) from a property detail page
+- Result counts from a search page, for crawl planning
+- "No results" detection, so an empty search ends a crawl instead of failing it
+- Shared request defaults (user agent, retryable HTTP statuses) for every engine and tool
+"""
+
+import html
+import json
+import re
+from urllib.parse import urljoin
+
+# Request defaults shared by Chrome and every requests-based engine/tool
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+RETRYABLE_STATUS = {403, 429, 500, 502, 503, 504}  # Worth a backed-off retry; anything else is final
+
+PROPERTY_HREF_RE = re.compile(r'''href\s*=\s*["']([^"']*/property-for-sale/\d+[^"']*)["']''', re.IGNORECASE)
+SHOW_MORE_TAG_RE = re.compile(r'''<a\b[^>]*\bpagination-load-next\b[^>]*>''', re.IGNORECASE)
+HREF_ATTR_RE = re.compile(r'''\bhref\s*=\s*["']([^"']+)["']''', re.IGNORECASE)
+
+JSON_LD_RE = re.compile(r'''<script[^>]*type=["']application/ld\+json["'][^>]*>(.*?)</script>''', re.IGNORECASE | re.DOTALL)
+META_RE = re.compile(r'''<meta[^>]*(?:property|name)=["'](og:title|og:description|description)["'][^>]*content=["']([^"']*)["']''', re.IGNORECASE)
+TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+# e.g. "3 bedroom Villa for sale in Javea" / "Apartment for sale in Torrevieja, Alicante"
+TITLE_FIELDS_RE = re.compile(r'(?:(\d+)\s+bed(?:room)?s?\s+)?([A-Za-z][A-Za-z \-]*?)\s+for\s+sale\s+in\s+([^|<\-–]+)', re.IGNORECASE)
+# Whole thousands groups only ("350,000", "1.250.000", "250 000"), so a following bed count or area isn't swallowed
+PRICE_NUMBER = r'(\d{1,3}(?:[.,]\d{3})+|\d{1,3}(?:[ \u00a0]\d{3})+|\d+)(?!\d)'
+PRICE_RE = re.compile(rf'(?:€|&euro;|EUR)\s*{PRICE_NUMBER}|{PRICE_NUMBER}\s*(?:€|&euro;|EUR)', re.IGNORECASE)
+SIZE_RE = re.compile(r'([\d][\d.,]*)\s*(?:m²|m2|m&sup2;|sq\.?\s*m)', re.IGNORECASE)
+
+
+def extract_property_id(href):
+    """Return the numeric property ID from a listing href, or None"""
+    if not href or '/property-for-sale/' not in href:
+        return None
+    property_id = href.split('/property-for-sale/')[-1].split('?')[0].split('#')[0]
+    if property_id and property_id.isdigit():
+        return property_id
+    return None
+
+
+def property_url(property_id):
+    """Build the canonical listing URL for a property ID"""
+    return f"https://www.thinkspain.com/property-for-sale/{property_id}"
+
+
+def _unescape_fragment(text):
+    # Fragments may arrive JSON-encoded, with escaped slashes and quotes
+    return text.replace('\\/', '/').replace('\\"', '"')
+
+
+def extract_property_hrefs(text):
+    """Return every property href found in an HTML (or JSON-wrapped HTML) fragment"""
+    text = _unescape_fragment(text)
+    return [html.unescape(href) for href in PROPERTY_HREF_RE.findall(text)]
+
+
+def extract_next_page_href(text, base_url):
+    """Return the absolute href of the Show More (pagination-load-next) link, or None"""
+    text = _unescape_fragment(text)
+    tag = SHOW_MORE_TAG_RE.search(text)
+    if not tag:
+        return None
+    href = HREF_ATTR_RE.search(tag.group(0))
+    if not href:
+        return None
+    return urljoin(base_url, html.unescape(href.group(1)))
+
+
+def extract_result_count(text, pattern):
+    """Return the total result count a search page reports (e.g. "1,234 properties"), or None"""
+    match = re.search(pattern, _unescape_fragment(text), re.IGNORECASE)
+    return _to_number(match.group(1)) if match else None
+
+
+def reports_no_results(text, pattern):
+    """True if a search page states it has nothing to show (e.g. "0 properties found")"""
+    return bool(re.search(pattern, _unescape_fragment(text), re.IGNORECASE))
+
+
+def _to_number(text):
+    # "1.250.000" / "1,250,000" / "250 000" -> 1250000; prices and sizes here are whole numbers
+    digits = re.sub(r'[^\d]', '', text or '')
+    return int(digits) if digits else None
+
+
+def _to_area(text):
+    # Sizes may carry a decimal part ("85.5", "85,5") as well as thousands separators ("1.200")
+    match = re.fullmatch(r'([\d.,]*?)(?:[.,](\d{1,2}))?', (text or '').strip())
+    if not match:
+        return None
+    whole = _to_number(match.group(1))
+    if whole is None:
+        return None
+    return whole + int(match.group(2)) / 10 ** len(match.group(2)) if match.group(2) else float(whole)
+
+
+def _json_ld_objects(text):
+    for block in JSON_LD_RE.findall(text):
+        try:
+            data = json.loads(html.unescape(block.strip()))
+        except ValueError:
+            continue
+        stack = data if isinstance(data, list) else [data]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, dict):
+                yield obj
+                stack.extend(v for v in obj.values() if isinstance(v, (dict, list)))
+            elif isinstance(obj, list):
+                stack.extend(obj)
+
+
+def parse_property_detail(text):
+    """Extract price, location, property type, bedrooms and size from a detail page"""
+    record = {'price_eur': None, 'location': None, 'property_type': None, 'bedrooms': None, 'size_m2': None, 'title': None}
+
+    # Structured data first, when the page carries it
+    for obj in _json_ld_objects(text):
+        offers = obj.get('offers')
+        if isinstance(offers, dict) and record['price_eur'] is None:
+            record['price_eur'] = _to_number(str(offers.get('price', '')))
+        address = obj.get('address')
+        if isinstance(address, dict) and record['location'] is None:
+            parts = [address.get(k) for k in ('addressLocality', 'addressRegion')]
+            record['location'] = ', '.join(p for p in parts if p) or None
+        floor_size = obj.get('floorSize')
+        if isinstance(floor_size, dict) and record['size_m2'] is None:
+            record['size_m2'] = _to_area(str(floor_size.get('value', '')))
+        if obj.get('numberOfRooms') and record['bedrooms'] is None:
+            record['bedrooms'] = _to_number(str(obj['numberOfRooms']))
+
+    # Fall back to the title / meta text, then the first price and size on the page
+    meta = {name.lower(): html.unescape(content) for name, content in META_RE.findall(text)}
+    title = meta.get('og:title')
+    if not title:
+        match = TITLE_RE.search(text)
+        title = html.unescape(match.group(1)).strip() if match else None
+    record['title'] = title
+
+    fields = TITLE_FIELDS_RE.search(title or '')
+    if fields:
+        bedrooms, property_type, location = fields.groups()
+        record['property_type'] = property_type.strip().title()
+        if record['location'] is None:
+            record['location'] = location.strip()
+        if record['bedrooms'] is None and bedrooms:
+            record['bedrooms'] = int(bedrooms)
+
+    if record['price_eur'] is None:
+        price = PRICE_RE.search(title or '') or PRICE_RE.search(text)
+        if price:
+            record['price_eur'] = _to_number(price.group(1) or price.group(2))
+    if record['size_m2'] is None:
+        size = SIZE_RE.search(meta.get('og:description') or meta.get('description') or '') or SIZE_RE.search(text)
+        if size:
+            record['size_m2'] = _to_area(size.group(1))
+
+    return record
+
+
+if __name__ == "__main__":
+    # Quick self-check of the detail parser: python property_parsing.py
+    cases = [
+        ('<title>2 bedroom Apartment for sale in Javea</title><p>€350,000 2 bed</p>', 'price_eur', 350000),
+        ('<p>€ 100,000 85 m2</p>', 'price_eur', 100000),
+        ('<p>€ 100,000 85 m2</p>', 'size_m2', 85),
+        ('<p>1.250.000 € - 3 beds</p>', 'price_eur', 1250000),
+        ('<p>Price: 250 000 EUR 120 m²</p>', 'price_eur', 250000),
+        ('<p>€350000</p>', 'price_eur', 350000),
+        ('<p>€ 1,495,000.00</p>', 'price_eur', 1495000),
+        ('<p>85,5 m2</p>', 'size_m2', 85.5),
+    ]
+    failures = 0
+    for text, field, expected in cases:
+        got = parse_property_detail(text)[field]
+        if got != expected:
+            failures += 1
+            print(f"✗ {field} of {text!r}: got {got!r}, expected {expected!r}")
+    print(f"{'✓' if not failures else '⚠'} {len(cases) - failures}/{len(cases)} parsing checks passed")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,120 @@
+"""
+Offline Harvest Replay
+- Re-runs the extraction pipeline (property_parsing) over a recorded harvest archive
+- One chunk per task across a ProcessPoolExecutor, so it runs at full CPU speed
+- Diffs the re-extracted IDs against the IDs the live run extracted, per click and overall
+- Reports throughput (clicks/s, MB/s) and writes a JSON report
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from checkpoint_journal import write_json_atomic
+from harvest_archive import iter_chunk, list_chunks
+from property_parsing import extract_property_hrefs, extract_property_id
+
+# ============================================================================
+# CONFIGURATION - Can be overridden with environment variables
+# ============================================================================
+REPLAY_ARCHIVE_DIR = os.getenv('REPLAY_ARCHIVE_DIR', os.getenv('RECORD_ARCHIVE_DIR', '') or 'harvest_archive')
+REPLAY_WORKERS = int(os.getenv('REPLAY_WORKERS', '0')) or os.cpu_count() or 1
+REPLAY_REPORT_FILE = os.getenv('REPLAY_REPORT_FILE', 'replay_report.json')
+REPLAY_DIFF_SAMPLES = int(os.getenv('REPLAY_DIFF_SAMPLES', '20'))  # Clicks with diffs listed in the report
+
+
+def extract_ids(hrefs):
+    return {int(pid) for pid in map(extract_property_id, hrefs) if pid}
+
+
+def replay_chunk(path):
+    """Re-extract every record in one chunk; runs in a worker process"""
+    start = time.perf_counter()
+    stats = {'chunk': os.path.basename(path), 'clicks': 0, 'bytes': 0, 'original_ids': 0, 'replayed_ids': 0}
+    original_all, replayed_all, diffs = set(), set(), []
+
+    for record in iter_chunk(path):
+        html = record.get('html') or ''
+        original = extract_ids(record.get('hrefs') or [])
+        replayed = extract_ids(extract_property_hrefs(html))
+
+        stats['clicks'] += 1
+        stats['bytes'] += len(html.encode('utf-8'))
+        original_all |= original
+        replayed_all |= replayed
+        if original != replayed:
+            diffs.append({
+                'click': record.get('click'),
+                'source': record.get('source'),
+                'missing': sorted(original - replayed),
+                'extra': sorted(replayed - original),
+            })
+
+    stats['original_ids'] = len(original_all)
+    stats['replayed_ids'] = len(replayed_all)
+    stats['seconds'] = time.perf_counter() - start
+    return stats, original_all, replayed_all, diffs
+
+
+def replay_archive(archive_dir, workers):
+    """Replay all chunks in parallel and build the report"""
+    chunks = list_chunks(archive_dir)
+    if not chunks:
+        return None
+
+    start = time.perf_counter()
+    original_all, replayed_all, diffs, chunk_stats = set(), set(), [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for stats, original, replayed, chunk_diffs in pool.map(replay_chunk, chunks):
+            chunk_stats.append(stats)
+            original_all |= original
+            replayed_all |= replayed
+            diffs.extend(chunk_diffs)
+    elapsed = time.perf_counter() - start
+
+    clicks = sum(s['clicks'] for s in chunk_stats)
+    megabytes = sum(s['bytes'] for s in chunk_stats) / 1024 / 1024
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'archive_dir': archive_dir,
+        'workers': workers,
+        'chunks': len(chunks),
+        'clicks': clicks,
+        'html_mb': round(megabytes, 2),
+        'seconds': round(elapsed, 3),
+        'clicks_per_second': round(clicks / elapsed, 1) if elapsed else None,
+        'mb_per_second': round(megabytes / elapsed, 2) if elapsed else None,
+        'original_ids': len(original_all),
+        'replayed_ids': len(replayed_all),
+        'missing_ids': len(original_all - replayed_all),
+        'extra_ids': len(replayed_all - original_all),
+        'clicks_with_diffs': len(diffs),
+        'diff_samples': sorted(diffs, key=lambda d: d['click'] or 0)[:REPLAY_DIFF_SAMPLES],
+        'chunk_stats': chunk_stats,
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("OFFLINE HARVEST REPLAY")
+    print("=" * 70)
+
+    archive_dir = sys.argv[1] if len(sys.argv) > 1 else REPLAY_ARCHIVE_DIR
+    report = replay_archive(archive_dir, REPLAY_WORKERS)
+    if report is None:
+        print(f"✗ No archive chunks found in {archive_dir}")
+        print("  Record one with RECORD_ARCHIVE_DIR=harvest_archive python production_harvester.py")
+        raise SystemExit(1)
+
+    write_json_atomic(REPLAY_REPORT_FILE, report, indent=2)
+
+    print(f"Chunks: {report['chunks']} | Clicks: {report['clicks']} | HTML: {report['html_mb']} MB | Workers: {report['workers']}")
+    print(f"Throughput: {report['clicks_per_second']} clicks/s, {report['mb_per_second']} MB/s ({report['seconds']}s)")
+    print(f"IDs: {report['original_ids']} original, {report['replayed_ids']} replayed")
+    if report['clicks_with_diffs']:
+        print(f"⚠ {report['clicks_with_diffs']} clicks differ: {report['missing_ids']} IDs missing, {report['extra_ids']} extra")
+    else:
+        print("✓ Replayed extraction matches the original results")
+    print(f"✓ Report saved to {REPLAY_REPORT_FILE}")
@@ -17,7 +17,7 @@ echo "====================================================="
 # Check progress
 if [ -f "scraper_progress.json" ]; then
     CLICKS=$(python3 -c "import json; print(json.load(open('scraper_progress.json'))['clicks_performed'])" 2>/dev/null || echo "?")
-    PROPERTIES=$(python3 -c "import json; print(len(json.load(open('scraper_progress.json'))['property_links']))" 2>/dev/null || echo "?")
+    PROPERTIES=$(python3 -c "import json; d=json.load(open('scraper_progress.json')); print(d.get('total_properties', len(d.get('property_links', []))))" 2>/dev/null || echo "?")
     echo "Previous progress: $CLICKS clicks, $PROPERTIES properties"
     echo "Continuing from where it left off..."
     echo ""
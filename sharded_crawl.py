@@ -0,0 +1,261 @@
+"""
+Parallel Sharded Crawl Coordinator
+- Splits the search space into shards (filtered search URLs or page ranges)
+- Runs N isolated production_harvester.py workers, one Chrome each
+- Every shard keeps its own checkpoint, log and output under SHARD_DIR
+- Per-worker pacing (MIN_WAIT_BETWEEN_CLICKS etc.) is inherited unchanged
+- Folds each finished shard into a shared deduplicated ID store, then exports one output file
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from id_store import PropertyIdStore
+
+# ============================================================================
+# CONFIGURATION - Can be overridden with environment variables
+# ============================================================================
+SHARD_WORKERS = int(os.getenv('SHARD_WORKERS', str(os.cpu_count() or 2)))
+SHARDS_FILE = os.getenv('SHARDS_FILE', 'shards.txt')  # One search URL per line (province, price band, type...)
+SHARD_PAGE_TEMPLATE = os.getenv('SHARD_PAGE_TEMPLATE', '')  # e.g. https://www.thinkspain.com/property-for-sale?page={page}
+SHARD_TOTAL_PAGES = int(os.getenv('SHARD_TOTAL_PAGES', '15628'))
+SHARD_PAGES_PER_SHARD = int(os.getenv('SHARD_PAGES_PER_SHARD', '500'))
+SHARD_DIR = os.getenv('SHARD_DIR', 'shards')
+MERGED_OUTPUT_FILE = os.getenv('MERGED_OUTPUT_FILE', 'harvested_properties.json')
+MERGED_ID_STORE_FILE = os.getenv('MERGED_ID_STORE_FILE', 'merged_property_ids.sqlite')
+SHARD_BASE_DEBUG_PORT = int(os.getenv('SHARD_BASE_DEBUG_PORT', '9300'))
+SHARD_BASE_METRICS_PORT = int(os.getenv('SHARD_BASE_METRICS_PORT', '0'))  # 0 = no per-shard metrics endpoint
+SHARD_START_STAGGER = float(os.getenv('SHARD_START_STAGGER', '15'))  # Seconds between worker launches
+HARVESTER_SCRIPT = str(Path(__file__).with_name('production_harvester.py'))
+
+# production_harvester.py exit codes (not imported: the coordinator needs no browser stack)
+EXIT_COMPLETE = 0
+EXIT_CLICK_CAP = 3
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+
+
+def load_shards():
+    """Build the shard list from SHARDS_FILE, or from SHARD_PAGE_TEMPLATE page ranges"""
+    shards = []
+    if os.path.exists(SHARDS_FILE):
+        with open(SHARDS_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                url = line.strip()
+                if url and not url.startswith('#'):
+                    shards.append({'start_url': url, 'max_clicks': None})
+    elif SHARD_PAGE_TEMPLATE:
+        for first_page in range(1, SHARD_TOTAL_PAGES + 1, SHARD_PAGES_PER_SHARD):
+            pages = min(SHARD_PAGES_PER_SHARD, SHARD_TOTAL_PAGES - first_page + 1)
+            shards.append({
+                'start_url': SHARD_PAGE_TEMPLATE.format(page=first_page),
+                'max_clicks': pages - 1,  # The start page itself is one page
+            })
+
+    for index, shard in enumerate(shards):
+        shard['name'] = f"shard-{index:03d}"
+    return shards
+
+
+class ShardedCrawlCoordinator:
+    def __init__(self, shards, workers=SHARD_WORKERS):
+        self.shards = shards
+        self.workers = max(1, min(workers, len(shards))) if shards else 1
+        self.shutdown_requested = False
+        self.processes = {}
+        self.launch_lock = threading.Lock()
+        self.merge_lock = threading.Lock()
+        self.last_launch = 0.0
+
+        signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGTERM, self.signal_handler)
+
+    def signal_handler(self, signum, frame):
+        """Forward shutdown to every worker so each saves its own checkpoint"""
+        logger.warning(f"⚠ Received signal {signum} - stopping {len(self.processes)} workers...")
+        self.shutdown_requested = True
+        for process in list(self.processes.values()):
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+
+    def shard_paths(self, shard):
+        shard_dir = Path(SHARD_DIR, shard['name']).resolve()
+        return {
+            'dir': shard_dir,
+            'output': shard_dir / 'harvested_properties.json',
+            'progress': shard_dir / 'scraper_progress.json',
+            'log': shard_dir / 'production_scraper.log',
+            'screenshots': shard_dir / 'error_screenshots',
+            'stats': shard_dir / 'harvester_stats.json',
+            'ndjson': shard_dir / 'harvested_properties.ndjson',
+            'archive': shard_dir / 'output_archive',
+            'profile': shard_dir / 'chrome_profile',
+            'id_store': shard_dir / 'property_ids.sqlite',
+            'done': shard_dir / 'done',
+            'incomplete': shard_dir / 'incomplete',
+        }
+
+    def shard_env(self, shard, slot):
+        """Per-shard environment: isolated files and a unique debugging port"""
+        paths = self.shard_paths(shard)
+        env = dict(os.environ)
+        env.update({
+            'START_URL': shard['start_url'],
+            'OUTPUT_FILE': str(paths['output']),
+            'PROGRESS_FILE': str(paths['progress']),
+            'JOURNAL_FILE': f"{paths['progress']}.journal",
+            'LOG_FILE': str(paths['log']),
+            'ERROR_SCREENSHOT_DIR': str(paths['screenshots']),
+            'REMOTE_DEBUGGING_PORT': str(SHARD_BASE_DEBUG_PORT + slot),
+            'STATS_FILE': str(paths['stats']),
+            'OUTPUT_NDJSON_FILE': str(paths['ndjson']),
+            'OUTPUT_ARCHIVE_DIR': str(paths['archive']),
+            'CHROME_PROFILE_DIR': str(paths['profile']),
+            'ID_STORE_FILE': str(paths['id_store']),
+            'METRICS_PORT': str(SHARD_BASE_METRICS_PORT + slot if SHARD_BASE_METRICS_PORT else 0),
+        })
+        if shard['max_clicks'] is not None:
+            env['MAX_CLICKS'] = str(shard['max_clicks'])
+        return env
+
+    def wait_for_launch_slot(self):
+        """Stagger Chrome launches so chromedriver patching doesn't race"""
+        with self.launch_lock:
+            wait = self.last_launch + SHARD_START_STAGGER - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self.last_launch = time.time()
+
+    def run_shard(self, shard, slot):
+        """Run one shard to completion in its own harvester process"""
+        paths = self.shard_paths(shard)
+        if paths['done'].exists():
+            logger.info(f"✓ {shard['name']} already complete - skipping")
+            return shard['name'], 0
+        if paths['incomplete'].exists():
+            logger.warning(f"⚠ {shard['name']} hit its click cap earlier - split it or raise the cap, then delete {paths['incomplete']}")
+            return shard['name'], EXIT_CLICK_CAP
+
+        paths['dir'].mkdir(parents=True, exist_ok=True)
+        self.wait_for_launch_slot()
+        if self.shutdown_requested:
+            return shard['name'], None
+
+        logger.info(f"▶ {shard['name']} (port {SHARD_BASE_DEBUG_PORT + slot}): {shard['start_url']}")
+        process = subprocess.Popen(
+            [sys.executable, HARVESTER_SCRIPT],
+            cwd=str(paths['dir']),
+            env=self.shard_env(shard, slot),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.processes[shard['name']] = process
+        returncode = process.wait()
+        del self.processes[shard['name']]
+
+        if returncode == EXIT_CLICK_CAP and not shard.get('complete_at_cap', True) and not self.shutdown_requested:
+            # The cap was only a safety limit here: keep what was found, but never call it done
+            self.merge_shard(shard)
+            paths['incomplete'].write_text(datetime.now().isoformat(), encoding='utf-8')
+            logger.warning(f"⚠ {shard['name']} stopped at its {shard['max_clicks']}-click cap - marked incomplete")
+        elif returncode in (EXIT_COMPLETE, EXIT_CLICK_CAP) and not self.shutdown_requested:
+            self.merge_shard(shard)
+            paths['done'].write_text(datetime.now().isoformat(), encoding='utf-8')
+            logger.info(f"✓ {shard['name']} finished")
+        else:
+            logger.warning(f"⚠ {shard['name']} stopped early (exit code {returncode}) - will resume on next run")
+        return shard['name'], returncode
+
+    def run(self):
+        """Run all shards across the worker pool, then merge their outputs"""
+        if not self.shards:
+            logger.error(f"No shards: create {SHARDS_FILE} or set SHARD_PAGE_TEMPLATE")
+            return
+
+        logger.info("=" * 70)
+        logger.info(f"SHARDED CRAWL: {len(self.shards)} shards across {self.workers} workers")
+        logger.info("=" * 70)
+
+        # Each pool slot owns one debugging port; shards queue for a free slot
+        free_slots = list(range(self.workers))
+        slots_lock = threading.Lock()
+
+        def run_in_slot(shard):
+            with slots_lock:
+                slot = free_slots.pop()
+            try:
+                return self.run_shard(shard, slot)
+            finally:
+                with slots_lock:
+                    free_slots.append(slot)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(run_in_slot, shard) for shard in self.shards]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Shard worker failed: {e}", exc_info=True)
+
+        self.merge_outputs()
+
+    def merge_shard(self, shard):
+        """Fold one finished shard into the shared store so it grows while other shards run"""
+        id_store = self.shard_paths(shard)['id_store']
+        if not id_store.exists():
+            return
+        with self.merge_lock:
+            try:
+                merged = PropertyIdStore(MERGED_ID_STORE_FILE)
+                merged.merge_from(str(id_store))
+                logger.info(f"  Shared store: {len(merged)} unique properties after {shard['name']}")
+                merged.close()
+            except Exception as e:
+                logger.error(f"Failed to merge {id_store}: {e}")
+
+    def merge_outputs(self):
+        """Bulk-merge every shard's ID store into one store and export the output file"""
+        merged = PropertyIdStore(MERGED_ID_STORE_FILE)
+        clicks = 0
+        for shard in self.shards:
+            paths = self.shard_paths(shard)
+            if not paths['id_store'].exists():
+                continue
+            try:
+                merged.merge_from(str(paths['id_store']))
+                if paths['progress'].exists():
+                    with open(paths['progress'], 'r', encoding='utf-8') as f:
+                        clicks += json.load(f).get('clicks_performed', 0)
+            except Exception as e:
+                logger.error(f"Failed to merge {paths['id_store']}: {e}")
+
+        total = merged.export_json(
+            MERGED_OUTPUT_FILE,
+            clicks_performed=clicks,
+            harvested_at=datetime.now().isoformat(),
+            shards=len(self.shards)
+        )
+        merged.close()
+        logger.info(f"✓ Merged {total} unique properties into {MERGED_OUTPUT_FILE} ({MERGED_ID_STORE_FILE})")
+
+
+if __name__ == "__main__":
+    coordinator = ShardedCrawlCoordinator(load_shards())
+    if len(sys.argv) > 1 and sys.argv[1] == '--merge-only':
+        coordinator.merge_outputs()
+    else:
+        coordinator.run()
@@ -31,7 +31,7 @@ echo ""
 if [ -f "scraper_progress.json" ]; then
     echo "Progress:"
     CLICKS=$(python3 -c "import json; print(json.load(open('scraper_progress.json'))['clicks_performed'])" 2>/dev/null || echo "?")
-    PROPERTIES=$(python3 -c "import json; print(len(json.load(open('scraper_progress.json'))['property_links']))" 2>/dev/null || echo "?")
+    PROPERTIES=$(python3 -c "import json; d=json.load(open('scraper_progress.json')); print(d.get('total_properties', len(d.get('property_links', []))))" 2>/dev/null || echo "?")
     UPDATED=$(python3 -c "import json; print(json.load(open('scraper_progress.json'))['last_updated'])" 2>/dev/null || echo "?")
     echo "  Clicks: $CLICKS"
     echo "  Properties: $PROPERTIES"
@@ -42,6 +42,24 @@ fi
 
 echo ""
 
+# Live throughput from the stats file (refreshed every STATS_EVERY clicks)
+if [ -f "harvester_stats.json" ]; then
+    echo "Live stats:"
+    python3 - <<'PY' 2>/dev/null || echo "  (stats file unreadable)"
+import json
+s = json.load(open('harvester_stats.json'))
+g, c, h = s['gauges'], s['counters'], s['histograms']
+print(f"  Updated: {s['timestamp']}")
+print(f"  Throughput: {s['clicks_per_minute']:.2f} clicks/min, {s['new_ids_per_minute']:.1f} new IDs/min")
+print(f"  Memory: {g.get('python_rss_mb', '?')} MB (Python) | {g.get('browser_rss_mb', '?')} MB (browser)")
+print(f"  Retries: {c.get('click_retries', 0)} click, {c.get('page_load_retries', 0)} page load | Screenshots: {c.get('screenshots', 0)}")
+for name, phase in sorted(h.items()):
+    if name != 'new_ids_per_click' and phase['count']:
+        print(f"  {name:<22} mean {phase['mean']:.3f}s  p95 <= {phase['p95']}s  (n={phase['count']})")
+PY
+    echo ""
+fi
+
 # Show last 10 log lines
 if [ -f "production_scraper.log" ]; then
     echo "Last 10 log lines:"
@@ -30,6 +30,13 @@ if screen -list | grep -q thinkspain; then
     echo "✓ Screen session closed"
 fi
 
+# With BROWSER_MODE=attach, Chrome is left running so the next start reattaches
+# in seconds with cookies and consent intact. Uncomment to stop it as well.
+# if pgrep -f "remote-debugging-port=9222" > /dev/null; then
+#     pkill -f "remote-debugging-port=9222"
+#     echo "✓ Persistent Chrome stopped"
+# fi
+
 # Optionally stop Xvfb (commented out - you may want to keep it running)
 # if pgrep -f "Xvfb :99" > /dev/null; then
 #     pkill -f "Xvfb :99"